@@ -5,7 +5,8 @@ from kivy.uix.button import Button
 
 from board import Board
 from controller import GameController
-from themes import Theme
+from scheduler import KivyScheduler
+from themes import get_theme
 from layout import TicTacToeLayout
 from homescreen import HomeScreen
 from utils import style_round_button
@@ -14,10 +15,15 @@ from utils import style_round_button
 # Cập nhật hàm create_game để nhận các tham số mới
 def create_game(mode: str = "friend", difficulty: str = "medium", element: str = "wood",
                 rows: int = 5, cols: int = 5, win_len: int = 4, num_obstacles: int = 5) -> TicTacToeLayout:
+    """Build a game screen layout; obstacle layouts try to leave one line winnable (best-effort)."""
     # Truyền các tham số này vào hàm khởi tạo của Board
-    board      = Board(rows=rows, cols=cols, win_len=win_len, num_obstacles=num_obstacles)
-    controller = GameController(board, mode, difficulty)
-    theme      = Theme(element)
+    # the home screen allows up to rows*cols-1 obstacles; ask for one open line, which
+    # is only kept while enough cells stay free (the obstacle count is never reduced)
+    board      = Board(rows=rows, cols=cols, win_len=win_len, num_obstacles=num_obstacles, min_open_windows=1,
+                       symmetric_hashing=True)
+    controller = GameController(board, mode, difficulty, scheduler=KivyScheduler(),
+                                ponder=True, calibrate=True)
+    theme      = get_theme(element)  # shared: textures are decoded once per theme
     return TicTacToeLayout(controller, theme)
 
 # ------------------------------------------------------------------ #
@@ -58,6 +64,8 @@ class TicTacToeApp(App):
         # Remove old game screen if it exists
         if self.sm.has_screen('game'):
             old_screen = self.sm.get_screen('game')
+            if hasattr(old_screen, 'game_widget'):
+                old_screen.game_widget._controller.stop_pondering()
             # Stop sounds before removing
             if hasattr(old_screen, 'game_widget') and hasattr(old_screen.game_widget, '_sounds'):
                 if old_screen.game_widget._sounds.bg:
@@ -76,6 +84,8 @@ class TicTacToeApp(App):
         # Stop any playing sounds
         if self.sm.has_screen('game'):
             game_screen = self.sm.get_screen('game')
+            if hasattr(game_screen, 'game_widget'):
+                game_screen.game_widget._controller.stop_pondering()
             if hasattr(game_screen, 'game_widget') and hasattr(game_screen.game_widget, '_sounds'):
                 if game_screen.game_widget._sounds.bg:
                     game_screen.game_widget._sounds.bg.stop()
@@ -0,0 +1,177 @@
+# arena.py
+"""Headless AI-vs-AI match runner.
+
+Plays two engine settings against each other over many seeded boards in a
+process pool, alternating who moves first, and reports the score with a
+confidence interval:
+
+    python arena.py medium hard --games 40 --rows 10 --cols 10 --win-len 5 --obstacles 10
+"""
+import argparse
+import json
+import math
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+
+from engines import create_engine
+from positions import make_position
+from minimax import EvalParams, MinimaxAI
+
+
+def play_game(spec: Dict) -> Dict:
+    """Play one seeded game between spec["x"] and spec["o"] difficulties. Runs in a worker process."""
+    rows, cols, win_len, num_obstacles = spec["geometry"]
+    board = make_position(rows, cols, win_len, num_obstacles, spec["opening"], spec["seed"])
+    # optional "x_params"/"o_params": EvalParams fields for that side (see tuner.py)
+    engines = {symbol: MinimaxAI(spec[side], params=EvalParams(**spec[f"{side}_params"]))
+                       if spec.get(f"{side}_params") else create_engine(spec[side])
+               for symbol, side in (("X", "x"), ("O", "o"))}
+    for ai in engines.values():
+        ai.search_time_limit *= spec["time_scale"]
+
+    x = sum(row.count("X") for row in board._grid)
+    o = sum(row.count("O") for row in board._grid)
+    current = "X" if x == o else "O"
+
+    moves: List[Dict] = []
+    winner: Optional[str] = None
+    while board.legal:
+        other = "O" if current == "X" else "X"
+        ai = engines[current]
+        result = ai.search(board, current, other)
+        move = result.move
+        if move is None or not board.place(move[0], move[1], current):
+            winner = other  # an engine that cannot produce a legal move forfeits
+            break
+        moves.append({"symbol": current, "move": list(move), "time": result.elapsed,
+                      "nodes": result.nodes, "depth": result.depth})
+        if board.has_winner(current):
+            winner = current
+            break
+        current = other
+
+    return {"game": spec["game"], "seed": spec["seed"], "x": spec["x"], "o": spec["o"],
+            "a_is_x": spec["a_is_x"], "winner": winner, "moves": moves}
+
+
+def score_interval(points: List[float], z: float = 1.96) -> Tuple[float, float, float]:
+    """Mean score and normal-approximation confidence interval (draws count as 0.5)."""
+    n = len(points)
+    if n == 0:
+        return 0.0, 0.0, 0.0
+    mean = sum(points) / n
+    var = sum((p - mean) ** 2 for p in points) / (n - 1) if n > 1 else 0.25
+    half = z * math.sqrt(var / n)
+    return mean, max(0.0, mean - half), min(1.0, mean + half)
+
+
+def elo_from_score(score: float) -> float:
+    score = min(max(score, 1e-3), 1 - 1e-3)
+    return -400 * math.log10(1 / score - 1)
+
+
+def summarize(a: str, b: str, games: List[Dict]) -> Dict:
+    points, wins, draws, losses = [], 0, 0, 0
+    per_side: Dict[str, Dict[str, float]] = {a: {"moves": 0, "time": 0.0, "nodes": 0},
+                                             b: {"moves": 0, "time": 0.0, "nodes": 0}}
+    if a == b:
+        per_side = {a: {"moves": 0, "time": 0.0, "nodes": 0}}
+    for g in games:
+        a_symbol = "X" if g["a_is_x"] else "O"
+        if g["winner"] is None:
+            draws += 1
+            points.append(0.5)
+        elif g["winner"] == a_symbol:
+            wins += 1
+            points.append(1.0)
+        else:
+            losses += 1
+            points.append(0.0)
+        for m in g["moves"]:
+            name = a if m["symbol"] == a_symbol else b
+            side = per_side[name]
+            side["moves"] += 1
+            side["time"] += m["time"]
+            side["nodes"] += m["nodes"]
+
+    mean, low, high = score_interval(points)
+    return {
+        "a": a, "b": b, "games": len(games),
+        "wins": wins, "draws": draws, "losses": losses,
+        "score": mean, "score_ci95": [low, high],
+        "elo": elo_from_score(mean),
+        "engines": {
+            name: {"avg_move_time": s["time"] / s["moves"] if s["moves"] else 0.0,
+                   "avg_nodes": s["nodes"] / s["moves"] if s["moves"] else 0.0}
+            for name, s in per_side.items()
+        },
+    }
+
+
+def run_match(a: str, b: str, games: int, geometry: Tuple[int, int, int, int], opening: int = 2,
+              seed: int = 1, time_scale: float = 1.0, workers: Optional[int] = None,
+              record_path: Optional[str] = None) -> Dict:
+    """Play `games` games of a vs b; every seed is played twice with colours swapped."""
+    specs = []
+    for i in range(games):
+        a_is_x = i % 2 == 0
+        specs.append({
+            "game": i, "seed": seed + i // 2, "geometry": geometry, "opening": opening,
+            "x": a if a_is_x else b, "o": b if a_is_x else a, "a_is_x": a_is_x,
+            "time_scale": time_scale,
+        })
+
+    results: List[Dict] = []
+    record = open(record_path, "w", encoding="utf-8") if record_path else None
+    try:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+            futures = [pool.submit(play_game, s) for s in specs]
+            for fut in as_completed(futures):
+                res = fut.result()
+                results.append(res)
+                if record:
+                    record.write(json.dumps(res) + "\n")
+    finally:
+        if record:
+            record.close()
+
+    results.sort(key=lambda g: g["game"])
+    return summarize(a, b, results)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Play two engine difficulties against each other headlessly.")
+    parser.add_argument("a", help="difficulty of engine A (fast/easy/medium/hard)")
+    parser.add_argument("b", help="difficulty of engine B")
+    parser.add_argument("--games", type=int, default=20)
+    parser.add_argument("--rows", type=int, default=5)
+    parser.add_argument("--cols", type=int, default=5)
+    parser.add_argument("--win-len", type=int, default=4)
+    parser.add_argument("--obstacles", type=int, default=5)
+    parser.add_argument("--opening", type=int, default=2, help="random stones played before the engines take over")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--time-scale", type=float, default=1.0)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--record", help="write one JSON line per finished game")
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    args = parser.parse_args(argv)
+
+    summary = run_match(args.a, args.b, args.games,
+                        (args.rows, args.cols, args.win_len, args.obstacles),
+                        opening=args.opening, seed=args.seed, time_scale=args.time_scale,
+                        workers=args.workers, record_path=args.record)
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        low, high = summary["score_ci95"]
+        print(f"{summary['a']} vs {summary['b']}: +{summary['wins']} ={summary['draws']} -{summary['losses']} "
+              f"score {summary['score']:.3f} [{low:.3f}, {high:.3f}] elo {summary['elo']:+.0f}")
+        for name, s in summary["engines"].items():
+            print(f"  {name:>6}: {s['avg_move_time'] * 1000:.1f} ms/move, {s['avg_nodes']:.0f} nodes/move")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
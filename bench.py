@@ -0,0 +1,166 @@
+# bench.py
+"""Headless benchmark for the search engine.
+
+Runs every difficulty over a fixed, seeded corpus of positions and writes
+machine-readable results that can be compared against a saved baseline:
+
+    python bench.py --out bench.json
+    python bench.py --baseline bench.json --tolerance 0.15
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+from typing import Dict, List, Optional
+
+from engines import create_engine
+from positions import GEOMETRIES, make_position, side_to_move
+
+STONE_COUNTS = (0, 4, 10)  # stones already on the board for each corpus position
+DIFFICULTIES = ("fast", "easy", "medium", "hard")
+CORPUS_SEED = 20240601
+
+
+# -------- corpus -----------------------------------------------------------
+
+def build_corpus(seed: int = CORPUS_SEED) -> List[Dict]:
+    """Return the list of benchmark positions, identical on every run for a given seed."""
+    corpus = []
+    for rows, cols, win_len, num_obstacles in GEOMETRIES:
+        for stones in STONE_COUNTS:
+            if stones >= rows * cols - num_obstacles:
+                continue
+            pos_seed = hash((seed, rows, cols, win_len, stones)) & 0xFFFFFFFF
+            corpus.append({
+                "id": f"{rows}x{cols}/{win_len}#{num_obstacles}-s{stones}",
+                "geometry": (rows, cols, win_len, num_obstacles),
+                "stones": stones,
+                "seed": pos_seed,
+            })
+    return corpus
+
+
+# -------- running ----------------------------------------------------------
+
+def run_position(entry: Dict, difficulty: str, time_scale: float = 1.0) -> Dict:
+    """Search one corpus position at one difficulty and collect the counters."""
+    rows, cols, win_len, num_obstacles = entry["geometry"]
+    board = make_position(rows, cols, win_len, num_obstacles, entry["stones"], entry["seed"])
+    ai_symbol, human_symbol = side_to_move(board)
+
+    ai = create_engine(difficulty)
+    ai.search_time_limit *= time_scale
+    random.seed(entry["seed"])  # random/Q-learning modes draw from the global generator
+
+    result = ai.search(board, ai_symbol, human_symbol)
+
+    return {
+        "position": entry["id"],
+        "difficulty": difficulty,
+        "move": list(result.move) if result.move else None,
+        "elapsed": result.elapsed,
+        "nodes": result.nodes,
+        "nps": result.nps,
+        "depth_times": [[it.depth, it.elapsed] for it in result.iterations],
+        "max_depth": result.depth,
+        "tt_probes": result.tt_probes,
+        "tt_hits": result.tt_hits,
+        "tt_hit_rate": result.tt_hit_rate,
+    }
+
+
+def summarize(results: List[Dict]) -> Dict[str, Dict]:
+    """Aggregate throughput per difficulty."""
+    summary: Dict[str, Dict] = {}
+    for res in results:
+        s = summary.setdefault(res["difficulty"], {"nodes": 0, "elapsed": 0.0, "tt_probes": 0, "tt_hits": 0, "positions": 0})
+        s["nodes"] += res["nodes"]
+        s["elapsed"] += res["elapsed"]
+        s["tt_probes"] += res["tt_probes"]
+        s["tt_hits"] += res["tt_hits"]
+        s["positions"] += 1
+    for s in summary.values():
+        s["nps"] = s["nodes"] / s["elapsed"] if s["elapsed"] > 0 else 0.0
+        s["tt_hit_rate"] = s["tt_hits"] / s["tt_probes"] if s["tt_probes"] else 0.0
+    return summary
+
+
+def run_benchmark(difficulties=DIFFICULTIES, time_scale: float = 1.0, seed: int = CORPUS_SEED,
+                  verbose: bool = True) -> Dict:
+    corpus = build_corpus(seed)
+    results = []
+    for difficulty in difficulties:
+        for entry in corpus:
+            res = run_position(entry, difficulty, time_scale)
+            results.append(res)
+            if verbose:
+                print(f"{difficulty:>6} {entry['id']:<22} move={res['move']} depth={res['max_depth']:>2} "
+                      f"nodes={res['nodes']:>8} nps={res['nps']:>10.0f} tt={res['tt_hit_rate']:.2%}")
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "seed": seed,
+            "time_scale": time_scale,
+        },
+        "results": results,
+        "summary": summarize(results),
+    }
+
+
+# -------- baseline comparison ----------------------------------------------
+
+def compare(current: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Return regression messages; nodes/sec dropping more than `tolerance` counts as a regression."""
+    problems = []
+    for difficulty, cur in current["summary"].items():
+        base = baseline.get("summary", {}).get(difficulty)
+        if not base or not base.get("nps") or difficulty in ("fast", "easy"):
+            continue  # the non-searching modes visit no nodes
+        ratio = cur["nps"] / base["nps"]
+        print(f"{difficulty:>6}: nps {cur['nps']:.0f} vs {base['nps']:.0f} ({ratio - 1:+.1%})")
+        if ratio < 1 - tolerance:
+            problems.append(f"{difficulty}: nodes/sec regressed by {1 - ratio:.1%}")
+
+    base_moves = {(r["position"], r["difficulty"]): r["move"] for r in baseline.get("results", [])}
+    for res in current["results"]:
+        old = base_moves.get((res["position"], res["difficulty"]))
+        if old is not None and old != res["move"] and res["difficulty"] not in ("fast", "easy"):
+            print(f"note: {res['difficulty']} {res['position']} move changed {old} -> {res['move']}")
+    return problems
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark MinimaxAI throughput and time-to-depth.")
+    parser.add_argument("--difficulty", action="append", choices=DIFFICULTIES,
+                        help="difficulty to run (repeatable, default: all)")
+    parser.add_argument("--time-scale", type=float, default=1.0,
+                        help="multiply every search_time_limit by this factor")
+    parser.add_argument("--seed", type=int, default=CORPUS_SEED)
+    parser.add_argument("--out", help="write JSON results to this file")
+    parser.add_argument("--baseline", help="compare against a previous JSON result file")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="allowed relative nodes/sec drop before failing (default 0.10)")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(args.difficulty or DIFFICULTIES, args.time_scale, args.seed)
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as fh:
+            baseline = json.load(fh)
+        problems = compare(report, baseline, args.tolerance)
+        for p in problems:
+            print(f"REGRESSION: {p}")
+        return 1 if problems else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,137 @@
 import random
-from typing import List, Tuple, Set
+import struct
+from typing import Dict, Iterable, List, Optional, Tuple, Set
+
+# Zobrist keys are shared by every board with the same geometry, so hashes
+# (and the search tables keyed by them) mean the same thing across games.
+_ZOBRIST_CACHE: Dict[Tuple[int, int, int, int], Dict[str, Dict[Tuple[int, int], int]]] = {}
+
+# Dihedral transforms of a rows x cols board, as (r, c) -> (r', c'); 1, 3, 6, 7 need a square board
+IDENTITY = 0
+INVERSE_TRANSFORM = (0, 3, 2, 1, 4, 5, 6, 7)
+_SQUARE_ONLY = (1, 3, 6, 7)
+
+
+def transform_cell(t: int, row: int, col: int, rows: int, cols: int) -> Tuple[int, int]:
+    """Image of (row, col) under dihedral transform t (0 identity, 1-3 rotations by 90/180/270, 4-7 reflections)."""
+    if t == 0:
+        return row, col
+    if t == 1:
+        return col, rows - 1 - row
+    if t == 2:
+        return rows - 1 - row, cols - 1 - col
+    if t == 3:
+        return cols - 1 - col, row
+    if t == 4:
+        return rows - 1 - row, col
+    if t == 5:
+        return row, cols - 1 - col
+    if t == 6:
+        return col, row
+    return cols - 1 - col, rows - 1 - row
+
+
+# Per-geometry cell maps for every transform the board shape allows (identity excluded)
+_SYMMETRY_CACHE: Dict[Tuple[int, int], Dict[int, Dict[Tuple[int, int], Tuple[int, int]]]] = {}
+
+
+def _symmetry_maps(rows: int, cols: int) -> Dict[int, Dict[Tuple[int, int], Tuple[int, int]]]:
+    maps = _SYMMETRY_CACHE.get((rows, cols))
+    if maps is None:
+        maps = {t: {(r, c): transform_cell(t, r, c, rows, cols) for r in range(rows) for c in range(cols)}
+                for t in range(1, 8) if rows == cols or t not in _SQUARE_ONLY}
+        _SYMMETRY_CACHE[(rows, cols)] = maps
+    return maps
+
+
+# Every win_len line of cells (as flat indices r * cols + c), per (rows, cols, win_len)
+_WINDOW_CACHE: Dict[Tuple[int, int, int], List[Tuple[int, ...]]] = {}
+
+# Snapshot: magic, version, rows, cols, win_len, hash_seed, move count; then the
+# cells at 2 bits each (row-major, 4 per byte) and one u32 cell index per move.
+# rows == cols == 0 marks a SparseBoard snapshot (see sparse_board.py).
+SNAPSHOT_MAGIC = b"TB"
+SNAPSHOT_VERSION = 2  # 2: 64-bit hash_seed
+SNAPSHOT_HEADER = struct.Struct("<2sBHHBQH")
+_MAX_HASH_SEED = 1 << 64  # hash_seed is stored as u64 here and in records.py GAME frames
+
+LAYOUT_ATTEMPTS = 4  # plain samples tried before reserving open windows
+
+
+def _check_hash_seed(hash_seed: int) -> None:
+    if not 0 <= hash_seed < _MAX_HASH_SEED:
+        raise ValueError(f"hash_seed {hash_seed} out of range (0 <= seed < 2**64)")
+
+
+def _windows(rows: int, cols: int, win_len: int) -> List[Tuple[int, ...]]:
+    key = (rows, cols, win_len)
+    windows = _WINDOW_CACHE.get(key)
+    if windows is None:
+        windows = []
+        for r in range(rows):
+            for c in range(cols):
+                for dr, dc in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                    end_r, end_c = r + dr * (win_len - 1), c + dc * (win_len - 1)
+                    if 0 <= end_r < rows and 0 <= end_c < cols:
+                        windows.append(tuple((r + dr * k) * cols + c + dc * k for k in range(win_len)))
+        _WINDOW_CACHE[key] = windows
+    return windows
+
+
+def count_open_windows(rows: int, cols: int, win_len: int, obstacles: List[Tuple[int, int]]) -> int:
+    """Number of win_len lines that contain no obstacle."""
+    blocked = {r * cols + c for r, c in obstacles}
+    return sum(1 for window in _windows(rows, cols, win_len) if blocked.isdisjoint(window))
+
+
+def generate_obstacles(rows: int, cols: int, win_len: int, count: int,
+                       rng: Optional[random.Random] = None, min_open_windows: int = 0) -> List[Tuple[int, int]]:
+    """Sample `count` obstacle cells without replacement (one pass, no retries on collisions).
+
+    With `min_open_windows`, layouts leaving fewer open win_len lines are
+    rejected a few times and then repaired by reserving windows before
+    sampling. The count is never reduced: when too few free cells remain,
+    fewer windows are reserved and the layout may have fewer open lines.
+    """
+    rng = rng or random.Random()
+    size = rows * cols
+    count = max(0, min(count, size))
+    windows = _windows(rows, cols, win_len)
+    target = min(min_open_windows, len(windows))
+    if target <= 0:
+        return [divmod(i, cols) for i in rng.sample(range(size), count)]
+
+    for _ in range(LAYOUT_ATTEMPTS):
+        picked = rng.sample(range(size), count)
+        blocked = set(picked)
+        if sum(1 for window in windows if blocked.isdisjoint(window)) >= target:
+            return [divmod(i, cols) for i in picked]
+
+    # Repair: keep windows free until `target` of them are, greedily taking the
+    # window that costs the fewest new cells (random among ties), then sample the rest
+    reserved: Set[int] = set()
+    candidates = rng.sample(windows, len(windows))
+    for _ in range(target):
+        window = min(candidates, key=lambda w: sum(1 for i in w if i not in reserved))
+        grown = reserved.union(window)
+        if size - len(grown) < count:
+            break  # not enough cells left for the obstacles
+        reserved = grown
+        candidates.remove(window)
+    free = [i for i in range(size) if i not in reserved]
+    return [divmod(i, cols) for i in rng.sample(free, count)]
+
 
 class Board:
-    """Game model: holds state and enforces the rules."""
+    """Game model: holds state and enforces the rules.
+
+    `min_open_windows` is best-effort: obstacle layouts keep that many open
+    win_len lines when the free cells allow it, but the obstacle count wins
+    when they do not (3x3/3 with 8 obstacles has no open line).
+    """
 
     EMPTY, OBSTACLE = ".", "#"
+    _CELL_CODES = {EMPTY: 0, OBSTACLE: 1, "X": 2, "O": 3}
 
     def __init__(
         self,
@@ -12,11 +139,23 @@ class Board:
         cols: int = 5,
         win_len: int = 4,
         num_obstacles: int = 5,
+        hash_seed: int = 0,
+        seed: Optional[int] = None,
+        min_open_windows: int = 0,
+        symmetric_hashing: bool = False,
     ) -> None:
         self._rows = rows
         self._cols = cols
         self._win_len = win_len
-        self._num_obstacles = num_obstacles
+        self._num_obstacles = num_obstacles  # obstacles actually on the board
+        self._obstacle_target = num_obstacles  # how many each reset asks the generator for
+        _check_hash_seed(hash_seed)  # snapshots and game records store it as u64
+        self._hash_seed = hash_seed
+        self._min_open_windows = min_open_windows
+        self._symmetric_hashing = symmetric_hashing
+        # Layout seeds come from here; a seeded board replays the same layouts
+        self._layout_rng = random.Random(seed)
+        self._layout_seed: Optional[int] = None
         
         self._zobrist_keys = {} # Store random numbers for Zobrist hashing
         self._current_zobrist_hash = 0 # Current hash of the board
@@ -32,28 +171,44 @@ class Board:
     @property
     def cols(self) -> int: return self._cols
 
+    @property
+    def win_len(self) -> int: return self._win_len
+
+    @property
+    def hash_seed(self) -> int: return self._hash_seed
+
+    @property
+    def num_obstacles(self) -> int: return self._num_obstacles
+
+    @property
+    def layout_seed(self) -> Optional[int]:
+        """Seed of the current obstacle layout (None when it was set explicitly)."""
+        return self._layout_seed
+
     @property
     def current_zobrist_hash(self) -> int:
         return self._current_zobrist_hash
 
     def reset(self) -> None:
         """Clear the board and randomly place fresh obstacles."""
-        self._grid: List[List[str]] = [
-            [self.EMPTY for _ in range(self._cols)] for _ in range(self._rows)
-        ]
-        # Khởi tạo lại _legal để chứa tất cả các ô trống
-        self._legal: Set[Tuple[int, int]] = set()
-        for r in range(self._rows):
-            for c in range(self._cols):
-                self._legal.add((r, c))
+        self._clear()
+        self._place_obstacles()
+        self._init_symmetry()
 
-        self._current_zobrist_hash = 0 # Reset hash
-        # Tính toán hash ban đầu cho bàn cờ trống
-        for r in range(self._rows):
-            for c in range(self._cols):
-                self._current_zobrist_hash ^= self._zobrist_keys[Board.EMPTY][(r, c)]
+    def set_obstacles(self, cells: List[Tuple[int, int]]) -> None:
+        """Clear the board and put obstacles exactly on `cells` (e.g. a recorded layout)."""
+        self._clear()
+        for r, c in cells:
+            self._add_obstacle(r, c)
+        self._num_obstacles = self._obstacle_target = len(cells)
+        self._layout_seed = None
+        self._init_symmetry()
 
-        self._place_obstacles()
+    @property
+    def obstacles(self) -> List[Tuple[int, int]]:
+        """Obstacle cells in row-major order."""
+        return [(r, c) for r in range(self._rows) for c in range(self._cols)
+                if self._grid[r][c] == Board.OBSTACLE]
 
     @property
     def legal(self) -> Set[Tuple[int, int]]:
@@ -80,9 +235,15 @@ class Board:
         # Update Zobrist hash: XOR out EMPTY, XOR in new symbol
         self._current_zobrist_hash ^= self._zobrist_keys[Board.EMPTY][(row, col)]
         self._current_zobrist_hash ^= self._zobrist_keys[symbol][(row, col)]
+        if self._sym_maps:
+            self._update_symmetric_hashes(row, col, symbol)
 
         self._grid[row][col] = symbol
         self._legal.remove((row, col)) # Remove from legal moves
+        self._occupied[(row, col)] = symbol
+        self._history.append((row, col, symbol))
+        if self._redo:
+            self._redo.clear()  # a new move forks the history
         return True
     
     def undo_place(self, row: int, col: int) -> None: # Đã bỏ tham số 'symbol'
@@ -93,15 +254,96 @@ class Board:
         # Lấy biểu tượng vừa được đặt tại vị trí này
         # Điều này giả định undo_place được gọi ngay sau một thao tác place
         # Và ô đó không trống
-        if self._grid[row][col] != Board.EMPTY:
+        if self._grid[row][col] not in (Board.EMPTY, Board.OBSTACLE):
             old_symbol = self._grid[row][col] # Lấy biểu tượng hiện tại trong ô
 
             # Cập nhật hàm băm Zobrist: XOR biểu tượng cũ ra, XOR EMPTY vào
             self._current_zobrist_hash ^= self._zobrist_keys[old_symbol][(row, col)]
             self._current_zobrist_hash ^= self._zobrist_keys[Board.EMPTY][(row, col)]
+            if self._sym_maps:
+                self._update_symmetric_hashes(row, col, old_symbol)
             
             self._grid[row][col] = Board.EMPTY
             self._legal.add((row, col)) # Thêm ô trở lại các nước đi hợp lệ
+            del self._occupied[(row, col)]
+            if self._history and self._history[-1][0] == row and self._history[-1][1] == col:
+                self._history.pop()  # the usual case: taking back the last move
+            else:
+                self._history.remove((row, col, old_symbol))
+
+    # -------- move history ------------------------------------------------
+
+    @property
+    def moves(self) -> List[Tuple[int, int, str]]:
+        """Moves played since the last reset, oldest first, as (row, col, symbol)."""
+        return list(self._history)
+
+    @property
+    def last_move(self) -> Optional[Tuple[int, int, str]]:
+        return self._history[-1] if self._history else None
+
+    def can_undo(self) -> bool:
+        return bool(self._history)
+
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+
+    def undo(self) -> Optional[Tuple[int, int, str]]:
+        """Take back the last move (hash and legal set restored exactly); it can be redone."""
+        if not self._history:
+            return None
+        move = self._history[-1]
+        self.undo_place(move[0], move[1])
+        self._redo.append(move)
+        return move
+
+    def redo(self) -> Optional[Tuple[int, int, str]]:
+        """Replay the most recently undone move."""
+        if not self._redo:
+            return None
+        move = self._redo.pop()
+        redo, self._redo = self._redo, []  # place() would clear the redo stack
+        self.place(*move)
+        self._redo = redo
+        return move
+
+    def apply_moves(self, moves: Iterable[Tuple[int, int]], symbol: str) -> int:
+        """Play `moves` alternately starting with `symbol`, all or nothing.
+
+        A move on an illegal cell, or any move after one that wins, rejects
+        the whole sequence: the position and the redo stack are left as they
+        were and -1 is returned. Otherwise returns the number of moves played
+        (the redo stack is cleared when there was at least one).
+        """
+        redo = list(self._redo)
+        applied = 0
+        for row, col in moves:
+            if applied and self.wins_at(*self._history[-1][:2]) or not self.place(row, col, symbol):
+                for _ in range(applied):
+                    self.undo_place(*self._history[-1][:2])
+                self._redo = redo
+                return -1
+            applied += 1
+            symbol = "O" if symbol == "X" else "X"
+        return applied
+
+    def wins_at(self, row: int, col: int) -> bool:
+        """Does the stone at (row, col) complete a line? Only the four lines through the cell are scanned."""
+        get = self._occupied.get
+        symbol = get((row, col))
+        if symbol is None or symbol == Board.OBSTACLE:
+            return False
+        for dr, dc in ((0, 1), (1, 0), (1, 1), (1, -1)):
+            count = 1
+            for sign in (1, -1):
+                r, c = row + sign * dr, col + sign * dc
+                while get((r, c)) == symbol:
+                    count += 1
+                    r += sign * dr
+                    c += sign * dc
+            if count >= self._win_len:
+                return True
+        return False
 
     def is_full(self) -> bool:
         """Are there any empty cells left?"""
@@ -109,47 +351,223 @@ class Board:
 
     def has_winner(self, symbol: str) -> bool:
         """Checks if the given symbol has won."""
-        # Check rows, columns, and diagonals
-        directions = [(0, 1), (1, 0), (1, 1), (1, -1)]  # H, V, D, Anti-D
-        for i in range(self._rows):
-            for j in range(self._cols):
-                if self._grid[i][j] != symbol:
-                    continue
-                for di, dj in directions:
-                    count, x, y = 1, i + di, j + dj
-                    while (
-                        0 <= x < self._rows
-                        and 0 <= y < self._cols
-                        and self._grid[x][y] == symbol
-                    ):
-                        count += 1
-                        if count >= self._win_len:
-                            return True
-                        x += di
-                        y += dj
+        # Only stones can start a line; scan forward from each in the four directions
+        get = self._occupied.get
+        for i, j, placed in self._history:
+            if placed != symbol:
+                continue
+            for di, dj in ((0, 1), (1, 0), (1, 1), (1, -1)):  # H, V, D, Anti-D
+                count, x, y = 1, i + di, j + dj
+                while get((x, y)) == symbol:
+                    count += 1
+                    if count >= self._win_len:
+                        return True
+                    x += di
+                    y += dj
         return False
 
+    # -------- geometry-independent access (shared with SparseBoard) -------
+
+    bounded = True  # finite rows x cols; SparseBoard is unbounded
+
+    def cell(self, row: int, col: int) -> str:
+        """Contents of a cell; outside the board counts as an obstacle."""
+        if 0 <= row < self._rows and 0 <= col < self._cols:
+            return self._grid[row][col]
+        return Board.OBSTACLE
+
+    @property
+    def occupied(self) -> Dict[Tuple[int, int], str]:
+        """Stones and obstacles by cell (read-only); absent cells inside `limits` are empty."""
+        return self._occupied
+
+    @property
+    def limits(self) -> Tuple[float, float, float, float]:
+        """Inclusive (row_min, row_max, col_min, col_max) of the playing area."""
+        return (0, self._rows - 1, 0, self._cols - 1)
+
+    def stones(self) -> List[Tuple[int, int, str]]:
+        """Occupied cells as (row, col, symbol), in the order they were played."""
+        return self._history
+
+    @property
+    def center(self) -> Optional[Tuple[int, int]]:
+        return (self._rows // 2, self._cols // 2)
+
+    def eval_region(self) -> Optional[Tuple[int, int, int, int]]:
+        """(r0, c0, r1, c1), inclusive: every line of win_len cells that touches a stone starts in here."""
+        if not self._history:
+            return None
+        reach = self._win_len - 1
+        rows = [r for r, _, _ in self._history]
+        cols = [c for _, c, _ in self._history]
+        return (max(0, min(rows) - reach), max(0, min(cols) - reach),
+                min(self._rows - 1, max(rows) + reach), min(self._cols - 1, max(cols) + reach))
+
+    def copy(self) -> "Board":
+        """Independent copy of the position and its history (Zobrist keys are shared; they never change)."""
+        clone = type(self).__new__(type(self))
+        clone.__dict__.update(self.__dict__)
+        clone._grid = [row[:] for row in self._grid]
+        clone._legal = set(self._legal)
+        clone._occupied = dict(self._occupied)
+        clone._history = list(self._history)
+        clone._redo = list(self._redo)
+        clone._sym_hashes = list(self._sym_hashes)
+        clone._layout_rng = random.Random()  # own stream: resetting the clone must not move the original's
+        clone._layout_rng.setstate(self._layout_rng.getstate())
+        return clone
+
+    # -------- symmetry-canonical hashing ----------------------------------
+
+    @property
+    def symmetries(self) -> Tuple[int, ...]:
+        """Transforms mapping the board and its obstacles onto themselves (only tracked with symmetric_hashing)."""
+        return (IDENTITY,) + tuple(self._sym_transforms)
+
+    def canonical(self) -> Tuple[int, int]:
+        """(hash, transform): the smallest hash over the board's symmetries and the transform producing it.
+
+        Symmetric positions share the hash. A move m on this board is
+        to_canonical(t, m) in the canonical frame; without symmetric_hashing
+        this is (current_zobrist_hash, IDENTITY).
+        """
+        best, best_t = self._current_zobrist_hash, IDENTITY
+        for t, h in zip(self._sym_transforms, self._sym_hashes):
+            if h < best:
+                best, best_t = h, t
+        return best, best_t
+
+    def to_canonical(self, t: int, move: Tuple[int, int]) -> Tuple[int, int]:
+        return move if t == IDENTITY else self._sym_maps[t][move]
+
+    def from_canonical(self, t: int, move: Tuple[int, int]) -> Tuple[int, int]:
+        return move if t == IDENTITY else self._sym_maps[INVERSE_TRANSFORM[t]][move]
+
+    # -------- snapshots -----------------------------------------------------
+
+    def to_bytes(self) -> bytes:
+        """Compact snapshot of the position and move order (the redo list and layout seed are not kept)."""
+        codes = Board._CELL_CODES
+        flat = [codes[value] for row in self._grid for value in row]
+        flat += [0] * (-len(flat) % 4)
+        cells = bytes(flat[i] | flat[i + 1] << 2 | flat[i + 2] << 4 | flat[i + 3] << 6
+                      for i in range(0, len(flat), 4))
+        moves = [r * self._cols + c for r, c, _ in self._history]
+        return (SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, self._rows, self._cols,
+                                     self._win_len, self._hash_seed, len(moves))
+                + cells + struct.pack("<%dI" % len(moves), *moves))
+
+    @staticmethod
+    def from_bytes(data: bytes) -> "Board":
+        """Rebuild a board (or SparseBoard) from `to_bytes()`; raises ValueError on foreign data."""
+        if len(data) < SNAPSHOT_HEADER.size:
+            raise ValueError("truncated board snapshot")
+        magic, version, rows, cols, win_len, hash_seed, n_moves = SNAPSHOT_HEADER.unpack_from(data)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            raise ValueError("not a board snapshot (or an unsupported version)")
+        if rows == 0 and cols == 0:
+            from sparse_board import SparseBoard  # sparse_board imports this module
+            return SparseBoard.from_snapshot(data, win_len, hash_seed, n_moves)
+
+        offset = SNAPSHOT_HEADER.size
+        size = rows * cols
+        if len(data) != offset + (size + 3) // 4 + 4 * n_moves:
+            raise ValueError("truncated board snapshot")
+        packed = data[offset:offset + (size + 3) // 4]
+        moves = struct.unpack_from("<%dI" % n_moves, data, offset + len(packed))
+        symbols = (Board.EMPTY, Board.OBSTACLE, "X", "O")
+        grid = [symbols[packed[i >> 2] >> ((i & 3) * 2) & 3] for i in range(size)]
+
+        board = Board(rows, cols, win_len, num_obstacles=0, hash_seed=hash_seed)
+        board.set_obstacles([divmod(i, cols) for i in range(size) if grid[i] == Board.OBSTACLE])
+        for i in moves:
+            if i >= size or grid[i] not in ("X", "O") or not board.place(i // cols, i % cols, grid[i]):
+                raise ValueError("corrupt board snapshot")
+        return board
+
+    def __reduce__(self):
+        # Pickle (process pools, IPC) as a snapshot instead of grids, sets and key tables
+        return (Board.from_bytes, (self.to_bytes(),))
+
     # -------- internal helpers --------------------------------------------
-    def _initialize_zobrist_keys(self):
-        """Generates random 64-bit integers for Zobrist hashing."""
-        self._zobrist_keys[Board.EMPTY] = {}
-        self._zobrist_keys["X"] = {}
-        self._zobrist_keys["O"] = {}
+    def _clear(self) -> None:
+        self._grid: List[List[str]] = [
+            [self.EMPTY for _ in range(self._cols)] for _ in range(self._rows)
+        ]
+        # Khởi tạo lại _legal để chứa tất cả các ô trống
+        self._legal: Set[Tuple[int, int]] = set()
         for r in range(self._rows):
             for c in range(self._cols):
-                self._zobrist_keys[Board.EMPTY][(r, c)] = random.getrandbits(64)
-                self._zobrist_keys["X"][(r, c)] = random.getrandbits(64)
-                self._zobrist_keys["O"][(r, c)] = random.getrandbits(64)
+                self._legal.add((r, c))
 
+        self._occupied: Dict[Tuple[int, int], str] = {}  # stones and obstacles
+        self._history: List[Tuple[int, int, str]] = []
+        self._redo: List[Tuple[int, int, str]] = []
+
+        self._sym_transforms: List[int] = []  # filled by _init_symmetry() once the layout is known
+        self._sym_maps: Dict[int, Dict[Tuple[int, int], Tuple[int, int]]] = {}
+        self._sym_hashes: List[int] = []
+
+        self._current_zobrist_hash = 0 # Reset hash
+        # Tính toán hash ban đầu cho bàn cờ trống
+        for r in range(self._rows):
+            for c in range(self._cols):
+                self._current_zobrist_hash ^= self._zobrist_keys[Board.EMPTY][(r, c)]
+
+    def _initialize_zobrist_keys(self):
+        """Looks up (or generates once per geometry) the 64-bit keys for Zobrist hashing."""
+        geometry = (self._rows, self._cols, self._win_len, self._hash_seed)
+        keys = _ZOBRIST_CACHE.get(geometry)
+        if keys is None:
+            rng = random.Random("zobrist:%d:%d:%d:%d" % geometry)
+            keys = {symbol: {} for symbol in (Board.EMPTY, Board.OBSTACLE, "X", "O")}
+            for r in range(self._rows):
+                for c in range(self._cols):
+                    for symbol in keys:
+                        keys[symbol][(r, c)] = rng.getrandbits(64)
+            _ZOBRIST_CACHE[geometry] = keys
+        self._zobrist_keys = keys
+
+
+    def _init_symmetry(self) -> None:
+        """Pick the transforms that preserve the obstacle layout and hash the position under each."""
+        if not self._symmetric_hashing:
+            return
+        maps = _symmetry_maps(self._rows, self._cols)
+        blocked = set(self.obstacles)
+        self._sym_transforms = [t for t, m in maps.items() if all(m[cell] in blocked for cell in blocked)]
+        self._sym_maps = {t: maps[t] for t in self._sym_transforms}
+        keys = self._zobrist_keys
+        self._sym_hashes = []
+        for t in self._sym_transforms:
+            m, h = maps[t], 0
+            for r in range(self._rows):
+                for c in range(self._cols):
+                    h ^= keys[self._grid[r][c]][m[(r, c)]]
+            self._sym_hashes.append(h)
+
+    def _update_symmetric_hashes(self, row: int, col: int, symbol: str) -> None:
+        """XOR a stone in or out of every transformed hash."""
+        empty_keys, symbol_keys = self._zobrist_keys[Board.EMPTY], self._zobrist_keys[symbol]
+        hashes = self._sym_hashes
+        for i, t in enumerate(self._sym_transforms):
+            cell = self._sym_maps[t][(row, col)]
+            hashes[i] ^= empty_keys[cell] ^ symbol_keys[cell]
 
     def _place_obstacles(self) -> None:
-        placed = 0
-        while placed < self._num_obstacles:
-            i = random.randrange(self._rows)
-            j = random.randrange(self._cols)
-            if self._grid[i][j] == self.EMPTY:
-                self._grid[i][j] = self.OBSTACLE
-                self._legal.remove((i, j)) # Obstacles are not legal moves
-                # Zobrist hash for obstacles is not typically tracked,
-                # as they are static. Only dynamic pieces affect the hash.
-                placed += 1
\ No newline at end of file
+        self._layout_seed = self._layout_rng.getrandbits(63)
+        layout = generate_obstacles(self._rows, self._cols, self._win_len, self._obstacle_target,
+                                    random.Random(self._layout_seed), self._min_open_windows)
+        for i, j in layout:
+            self._add_obstacle(i, j)
+        self._num_obstacles = len(layout)  # the request is clamped to the board size
+
+    def _add_obstacle(self, i: int, j: int) -> None:
+        self._grid[i][j] = self.OBSTACLE
+        self._legal.remove((i, j)) # Obstacles are not legal moves
+        self._occupied[(i, j)] = self.OBSTACLE
+        # Obstacles are part of the hash so positions from different
+        # layouts never share table entries.
+        self._current_zobrist_hash ^= self._zobrist_keys[Board.EMPTY][(i, j)]
+        self._current_zobrist_hash ^= self._zobrist_keys[Board.OBSTACLE][(i, j)]
\ No newline at end of file
@@ -0,0 +1,222 @@
+# calibration.py
+"""Per-geometry search settings calibrated on this machine.
+
+The fixed radius/depth of each difficulty is quick on 5x5 and hopeless on
+15x15. `settings_for()` runs a short micro-benchmark on a few seeded
+positions of the requested geometry, picks the widest move radius and the
+depth that fit the difficulty's latency target, and caches the choice on
+disk so later runs start immediately. Calibrate offline with the CLI, or let
+the game call `calibrate_in_background()`: it measures in a worker process
+while the engine keeps its built-in settings, so the UI never waits on it.
+
+    python calibration.py --rows 15 --cols 15 --win-len 5 --obstacles 20
+    TTT_CALIBRATION=~/.ttt-calibration.json python main.py
+
+The cache lives in the per-user cache directory ($XDG_CACHE_HOME or
+~/.cache, %LOCALAPPDATA% on Windows) unless $TTT_CALIBRATION names a file.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional, Tuple
+
+from positions import GEOMETRIES, make_position, side_to_move
+from minimax import MinimaxAI, SearchLimits
+
+CALIBRATION_ENV = "TTT_CALIBRATION"
+CACHE_DIR_NAME = "tic-tac-toe"
+CACHE_FILE_NAME = "calibration.json"
+CALIBRATION_VERSION = 1
+
+CALIBRATION_BUDGET = 0.5  # seconds of searching per position and candidate
+CALIBRATION_SEEDS = (11, 12)
+TARGET_FRACTION = 0.8     # leave headroom below the latency target
+
+# Candidate (root radius, inner radius) pairs, widest first, and the depth each difficulty should reach
+RADIUS_LADDER: Dict[str, List[Tuple[int, int]]] = {
+    "hard": [(4, 3), (3, 2), (2, 1)],
+    "medium": [(2, 1), (1, 1)],
+}
+MIN_DEPTH = {"hard": 4, "medium": 2}
+
+
+@dataclass
+class SearchSettings:
+    root_radius: int
+    inner_radius: int
+    max_depth: int
+    time_limit: float
+
+    def apply(self, ai: MinimaxAI) -> None:
+        ai.root_radius = self.root_radius
+        ai.inner_radius = self.inner_radius
+        ai.max_depth = self.max_depth
+        ai.search_time_limit = self.time_limit
+
+
+# -------- measuring --------------------------------------------------------
+
+def _reachable_depth(geometry: Tuple[int, int, int, int], difficulty: str, radii: Tuple[int, int],
+                     target: float, seed: int) -> int:
+    """Deepest iteration predicted to finish within `target` seconds on one seeded position."""
+    rows, cols, win_len, num_obstacles = geometry
+    stones = min(6, (rows * cols - num_obstacles) // 3)
+    board = make_position(rows, cols, win_len, num_obstacles, stones, seed)
+    ai_symbol, human_symbol = side_to_move(board)
+    ai = MinimaxAI(difficulty)
+    ai.root_radius, ai.inner_radius = radii
+
+    times = [it.elapsed for it in ai.iter_search(board, ai_symbol, human_symbol,
+                                                  SearchLimits(time_limit=CALIBRATION_BUDGET,
+                                                               soft_time_limit=CALIBRATION_BUDGET))]
+    if not times:
+        return 1  # not even depth 1 in the budget; always search at least one ply
+    depth = len(times)
+    if depth >= ai.max_depth or times[-1] > target:
+        return min(depth, ai.max_depth)
+    # extrapolate with the effective branching factor of the last two iterations
+    ebf = max(2.0, times[-1] / times[-2]) if depth > 1 and times[-2] > 0 else 4.0
+    elapsed = times[-1]
+    while depth < ai.max_depth and elapsed * ebf <= target:
+        elapsed *= ebf
+        depth += 1
+    return depth
+
+
+def calibrate(geometry: Tuple[int, int, int, int], difficulty: str,
+              target: Optional[float] = None) -> Optional[SearchSettings]:
+    """Pick radius/depth for `difficulty` on `geometry`; None for the non-searching difficulties."""
+    ladder = RADIUS_LADDER.get(difficulty)
+    if ladder is None:
+        return None
+    if target is None:
+        target = MinimaxAI(difficulty).search_time_limit
+    budget = target * TARGET_FRACTION
+
+    chosen = None
+    for radii in ladder:
+        depth = min(_reachable_depth(geometry, difficulty, radii, budget, seed) for seed in CALIBRATION_SEEDS)
+        chosen = SearchSettings(radii[0], radii[1], max(1, depth), target)
+        if depth >= MIN_DEPTH[difficulty]:
+            break  # widest neighbourhood that still reaches the wanted depth
+    return chosen
+
+
+# -------- cache ------------------------------------------------------------
+
+def _host() -> str:
+    return f"{platform.node()}|{platform.machine()}|{platform.python_implementation()} {platform.python_version()}"
+
+
+def _key(geometry: Tuple[int, int, int, int], difficulty: str) -> str:
+    rows, cols, win_len, num_obstacles = geometry
+    return f"{rows}x{cols}/{win_len}#{num_obstacles}:{difficulty}"
+
+
+def _load(path: str) -> Dict[str, Dict]:
+    try:
+        with open(path, encoding="utf-8") as fh:
+            data = json.load(fh)
+    except (OSError, ValueError):
+        return {}
+    if data.get("version") != CALIBRATION_VERSION or data.get("host") != _host():
+        return {}  # measured elsewhere; recalibrate
+    return data.get("entries", {})
+
+
+def _store(path: str, entries: Dict[str, Dict]) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump({"version": CALIBRATION_VERSION, "host": _host(), "entries": entries}, fh, indent=2)
+    os.replace(tmp, path)
+
+
+def cache_path() -> str:
+    """$TTT_CALIBRATION, else calibration.json in the per-user cache directory."""
+    if os.environ.get(CALIBRATION_ENV):
+        return os.path.expanduser(os.environ[CALIBRATION_ENV])
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~\\AppData\\Local")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, CACHE_DIR_NAME, CACHE_FILE_NAME)
+
+
+def cached_settings(geometry: Tuple[int, int, int, int], difficulty: str,
+                    path: Optional[str] = None) -> Optional[SearchSettings]:
+    """Settings already measured on this host, without calibrating."""
+    entry = _load(path or cache_path()).get(_key(geometry, difficulty))
+    return SearchSettings(**entry) if entry else None
+
+
+def settings_for(geometry: Tuple[int, int, int, int], difficulty: str, path: Optional[str] = None,
+                 recalibrate: bool = False) -> Optional[SearchSettings]:
+    """Cached settings for this host, calibrating (and caching) on first use."""
+    if difficulty not in RADIUS_LADDER:
+        return None
+    path = path or cache_path()
+    entries = _load(path)
+    key = _key(geometry, difficulty)
+    if key in entries and not recalibrate:
+        return SearchSettings(**entries[key])
+    settings = calibrate(geometry, difficulty)
+    entries[key] = asdict(settings)
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        _store(path, entries)
+    except OSError:
+        pass  # read-only location: use the settings for this run only
+    return settings
+
+
+_POOL: Optional[ProcessPoolExecutor] = None
+_PENDING: Dict[str, Future] = {}
+
+
+def calibrate_in_background(geometry: Tuple[int, int, int, int], difficulty: str,
+                            path: Optional[str] = None) -> Optional[Future]:
+    """Calibrate (and cache) in a worker process; the future yields the SearchSettings.
+
+    One job runs per geometry/difficulty at a time; None for the
+    non-searching difficulties.
+    """
+    global _POOL
+    if difficulty not in RADIUS_LADDER:
+        return None
+    key = _key(geometry, difficulty)
+    future = _PENDING.get(key)
+    if future is None or future.done():
+        if _POOL is None:
+            _POOL = ProcessPoolExecutor(max_workers=1)  # one core for measuring; timings stay honest
+        future = _PENDING[key] = _POOL.submit(settings_for, geometry, difficulty, path or cache_path())
+    return future
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Calibrate search radius and depth per board geometry.")
+    parser.add_argument("--rows", type=int)
+    parser.add_argument("--cols", type=int)
+    parser.add_argument("--win-len", type=int)
+    parser.add_argument("--obstacles", type=int, default=0)
+    parser.add_argument("--difficulty", action="append", choices=sorted(RADIUS_LADDER))
+    parser.add_argument("--cache", help=f"cache file (default: ${CALIBRATION_ENV} or {cache_path()})")
+    args = parser.parse_args(argv)
+
+    if args.rows and args.cols and args.win_len:
+        geometries = [(args.rows, args.cols, args.win_len, args.obstacles)]
+    else:
+        geometries = GEOMETRIES
+    for geometry in geometries:
+        for difficulty in args.difficulty or sorted(RADIUS_LADDER):
+            s = settings_for(geometry, difficulty, args.cache, recalibrate=True)
+            print(f"{_key(geometry, difficulty):<20} radius {s.root_radius}/{s.inner_radius} "
+                  f"depth {s.max_depth:>2} time {s.time_limit:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
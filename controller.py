@@ -1,10 +1,15 @@
 # controller.py
+from concurrent.futures import Future
 from enum import Enum, auto
-from typing import List, Tuple, Protocol, Optional
-from kivy.clock import Clock
+from typing import Dict, Iterable, List, Tuple, Protocol, Optional
 
 from board import Board
-from minimax import MinimaxAI
+from calibration import cached_settings, calibrate_in_background
+from engines import Engine, select_engine
+from minimax import MinimaxAI, SearchResult
+from ponder import Ponderer
+from records import GameRecorder, RecordWriter, default_writer
+from scheduler import Scheduler, KivyScheduler
 
 
 class GameState(Enum):
@@ -18,6 +23,7 @@ class GameObserver(Protocol):
     """Anything interested in board or state changes implements this."""
 
     def on_board_change(self, coords: Tuple[int, int], symbol: str) -> None: ...
+    def on_board_sync(self) -> None: ...  # many cells changed at once; redraw from getBoard()
     def on_state_change(
         self, state: GameState, next_turn: Optional[str]
     ) -> None: ...
@@ -26,83 +32,255 @@ class GameObserver(Protocol):
 class GameController:
     """Link between UI and model; enforces turn flow."""
 
-    def __init__(self, board: Board, mode: str = "friend", difficulty: str = "medium") -> None:
+    def __init__(self, board: Board, mode: str = "friend", difficulty: str = "medium",
+                 scheduler: Optional[Scheduler] = None, ponder: bool = False,
+                 calibrate: bool = False, recorder: Optional[RecordWriter] = None) -> None:
         self._board = board
+        # Runs deferred AI moves; Kivy is only imported when the Kivy scheduler first fires
+        self._scheduler: Scheduler = scheduler if scheduler is not None else KivyScheduler()
         self._current = "X"
         self._state = GameState.IN_PROGRESS
         self._observers: List[GameObserver] = []
         self._mode = mode
         self._difficulty = difficulty
         
-        # Initialize AI if playing against bot
+        # Initialize AI if playing against bot; the engine is re-selected before every AI move
+        self._engines: Dict[str, Engine] = {}
+        self._calibrate = calibrate
+        self._calibration: Optional[Future] = None  # background calibration in flight
         if mode == "bot":
-            self._ai = MinimaxAI(difficulty)
             self._human_symbol = "X"
             self._ai_symbol = "O"
+            self._ai: Optional[Engine] = self._select_engine()
         else:
             self._ai = None
+        # Search the predicted reply while the human thinks (only the searching difficulties benefit)
+        self._ponder: Optional[Ponderer] = None
+        if ponder and self._ai is not None and difficulty in ("medium", "hard"):
+            self._ponder = Ponderer()
+        self._last_human_move: Optional[Tuple[int, int]] = None
+
+        # Stream every game into a record file (explicit writer or $TTT_RECORD)
+        writer = recorder if recorder is not None else default_writer()
+        self._recorder: Optional[GameRecorder] = None
+        if writer is not None:
+            self._recorder = GameRecorder(self, writer)
+            self.add_observer(self._recorder)
+            self._recorder.begin()
 
     # -------- public API --------------------------------------------------
 
     def play(self, row: int, col: int) -> None:
         if self._state is not GameState.IN_PROGRESS:
             return
+        if self.is_ai_turn():
+            return  # the bot is thinking; ignore input until it has moved
 
         # human move
         if not self._board.place(row, col, self._current):
             return  # invalid move
         self._notify_board((row, col), self._current)
+        self._last_human_move = (row, col)
 
-        # check win/draw conditions
-        if self._board.has_winner(self._current):
+        # check win/draw conditions (only lines through the new stone can have changed)
+        if self._board.wins_at(row, col):
             self._state = GameState.X_WON if self._current == "X" else GameState.O_WON
         elif self._board.is_full():
             self._state = GameState.DRAW
         else:
             # switch turns
             self._current = "O" if self._current == "X" else "X"
-            # if vs bot, schedule AI move
-            if self._mode == "bot" and self._current == self._ai_symbol and self._state == GameState.IN_PROGRESS:
-                # Adjust delay based on difficulty
-                delay = 0.0 if self._difficulty == "fast" else 0.5 #
-                Clock.schedule_once(self._make_ai_move, delay) #
+
+        if self._ponder is not None and (self._state is not GameState.IN_PROGRESS
+                                         or (row, col) != self._ponder.predicted):
+            self._ponder.stop()  # prediction missed: free the AI for the real search right away
 
         self._notify_state()
+
+        # if vs bot, schedule AI move (after observers saw the human move, so synchronous schedulers stay in order)
+        self._schedule_ai_move()
+
+    def _schedule_ai_move(self) -> None:
+        if self._mode == "bot" and self._current == self._ai_symbol and self._state == GameState.IN_PROGRESS:
+            # Adjust delay based on difficulty
+            delay = 0.0 if self._difficulty == "fast" else 0.5 #
+            self._scheduler.schedule_once(self._make_ai_move, delay) #
     
     def _make_ai_move(self, dt):
         """Make AI move after a short delay."""
-        if self._state != GameState.IN_PROGRESS:
-            return
+        if self._state != GameState.IN_PROGRESS or not self.is_ai_turn():
+            return  # the game ended or the position was taken back meanwhile
             
-        move = self._ai.get_best_move(self._board, self._ai_symbol, self._human_symbol) #
-        if move:
-            # Make the move directly on the board
-            if self._board.place(move[0], move[1], self._ai_symbol): #
-                self._notify_board((move[0], move[1]), self._ai_symbol) #
-                
-                # Check win/draw conditions
-                if self._board.has_winner(self._ai_symbol): #
-                    self._state = GameState.O_WON #
-                elif self._board.is_full(): #
-                    self._state = GameState.DRAW #
+        move, limits = None, None
+        if self._ponder is not None and self._last_human_move is not None:
+            move, limits = self._ponder.take(self._last_human_move)
+        self._ai = self._select_engine()  # after the ponder thread has left the engine
+        if move is None:
+            move = self._ai.get_best_move(self._board, self._ai_symbol, self._human_symbol, limits) #
+        if move and self.apply_ai_move(move) and self._ponder is not None \
+                and self._state is GameState.IN_PROGRESS and isinstance(self._ai, MinimaxAI):
+            self._ponder.start(self._ai, self._board, self._ai_symbol, self._human_symbol)
+
+    def _select_engine(self) -> Engine:
+        """Cheapest registered engine for this difficulty and position; instances are kept per game."""
+        spec = select_engine(self._board, self._difficulty)
+        engine = self._engines.get(spec.name)
+        if engine is None:
+            engine = self._engines[spec.name] = spec.create(self._difficulty)
+            if self._calibrate and spec.name == "minimax" and self._board.bounded:
+                # Radius/depth measured for this geometry on this machine (cached on disk); when
+                # there is none yet, measure in a worker process and keep the defaults meanwhile
+                board = self._board
+                geometry = (board.rows, board.cols, board.win_len, board.num_obstacles)
+                settings = cached_settings(geometry, self._difficulty)
+                if settings is not None:
+                    settings.apply(engine)
                 else:
-                    # Switch back to human turn
-                    self._current = self._human_symbol #
-                
-                self._notify_state() #
+                    self._calibration = calibrate_in_background(geometry, self._difficulty)
+        self._apply_finished_calibration()
+        return engine
+
+    def _apply_finished_calibration(self) -> None:
+        """Hand background calibration results to the minimax engine once they are in."""
+        future = self._calibration
+        if future is None or not future.done():
+            return
+        self._calibration = None
+        engine = self._engines.get("minimax")
+        settings = future.result() if future.exception() is None else None
+        if settings is not None and engine is not None:
+            settings.apply(engine)
+
+    def apply_ai_move(self, move: Tuple[int, int]) -> bool:
+        """Play a move chosen for the AI side, possibly computed elsewhere (e.g. a worker process)."""
+        if self._state is not GameState.IN_PROGRESS or not self.is_ai_turn():
+            return False
+        # Make the move directly on the board
+        if not self._board.place(move[0], move[1], self._ai_symbol): #
+            return False
+        self._notify_board((move[0], move[1]), self._ai_symbol) #
+
+        # Check win/draw conditions
+        if self._board.wins_at(move[0], move[1]): #
+            self._state = GameState.O_WON if self._ai_symbol == "O" else GameState.X_WON #
+        elif self._board.is_full(): #
+            self._state = GameState.DRAW #
+        else:
+            # Switch back to human turn
+            self._current = self._human_symbol #
+
+        self._notify_state() #
+        return True
+
+    # -------- history ----------------------------------------------------
+
+    def undo(self) -> bool:
+        """Take back the last move; against the bot, back to the human's previous turn."""
+        self.stop_pondering()
+        if not self._board.undo():
+            return False
+        while self._board.last_move is not None and self.is_ai_symbol(self._other(self._board.last_move[2])):
+            self._board.undo()  # don't leave the human facing a position where the AI is to move
+        self._sync()
+        return True
+
+    def redo(self) -> bool:
+        """Replay undone moves up to the human's next turn."""
+        self.stop_pondering()
+        move = self._board.redo()
+        if move is None:
+            return False
+        while self.is_ai_symbol(self._other(move[2])) and self._board.can_redo() \
+                and not self._board.wins_at(move[0], move[1]):
+            move = self._board.redo()
+        self._sync()
+        self._schedule_ai_move()
+        return True
+
+    def apply_moves(self, moves: Iterable[Tuple[int, int]]) -> bool:
+        """Play a whole sequence from the current position, alternating sides, with one notification.
+
+        On an illegal move, or a move after the game has ended, the position
+        is left unchanged and False is returned.
+        """
+        if self._state is not GameState.IN_PROGRESS:
+            return False
+        self.stop_pondering()
+        applied = self._board.apply_moves(moves, self._current)
+        if applied < 0:
+            return False
+        if applied:
+            self._last_human_move = None
+            self._sync()
+            self._schedule_ai_move()
+        return True
+
+    def _sync(self) -> None:
+        """Recompute turn and result from the board's history and notify observers once."""
+        last = self._board.last_move
+        if last is None:
+            self._current, self._state = "X", GameState.IN_PROGRESS
+        else:
+            row, col, symbol = last
+            self._current = symbol  # like play(): the turn only passes while the game goes on
+            if self._board.wins_at(row, col):
+                self._state = GameState.X_WON if symbol == "X" else GameState.O_WON
+            elif self._board.is_full():
+                self._state = GameState.DRAW
+            else:
+                self._state = GameState.IN_PROGRESS
+                self._current = self._other(symbol)
+        for o in self._observers:
+            o.on_board_sync()
+        self._notify_state()
+
+    @staticmethod
+    def _other(symbol: str) -> str:
+        return "O" if symbol == "X" else "X"
+
+    def stop_pondering(self) -> None:
+        """Stop any background search, e.g. before the game is thrown away."""
+        if self._ponder is not None:
+            self._ponder.stop()
+
+    def is_ai_turn(self) -> bool:
+        return self._mode == "bot" and self._current == self._ai_symbol
+
+    @property
+    def state(self) -> GameState:
+        return self._state
+
+    @property
+    def current(self) -> str:
+        return self._current
+
+    @property
+    def difficulty(self) -> str:
+        return self._difficulty
+
+    @property
+    def mode(self) -> str:
+        return self._mode
+
+    @property
+    def last_search(self) -> Optional[SearchResult]:
+        """Result of the engine's most recent search (None when not playing the bot)."""
+        return self._ai.last_result if self._ai is not None else None
+
+    def is_ai_symbol(self, symbol: str) -> bool:
+        return self._mode == "bot" and symbol == self._ai_symbol
 
     def getBoard(self) -> Board:
         return self._board
     
     def reset(self) -> None:
+        self.stop_pondering()
+        self._last_human_move = None
         self._board.reset()
-        self._current = "X"
-        self._state = GameState.IN_PROGRESS
-        # Thông báo cho tất cả các ô trên BoardWidget để reset về trạng thái trống
-        for r in range(self._board.rows):
-            for c in range(self._board.cols):
-                self._notify_board((r, c), Board.EMPTY) # Thêm Board.EMPTY để reset hiển thị
-        self._notify_state()
+        if self._recorder is not None:
+            self._recorder.begin()
+        # One sync instead of a per-cell EMPTY for every cell (an unbounded board has no cell list)
+        self._sync()
 
     # -------- observer notifications --------------------------------------
 
@@ -0,0 +1,133 @@
+# engine_service.py
+"""Batched move service: many games' AI moves served per engine call.
+
+Requests are ordered by deadline and packed into chunks; each chunk is
+searched sequentially inside one worker process by long-lived engine
+instances, so the transposition table and evaluation cache stay warm
+across requests and games of the same geometry (see Board Zobrist keys).
+Results are yielded as chunks finish.
+
+    service = EngineService(workers=4)
+    for result in service.run_batch(requests):
+        ...
+"""
+import itertools
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from board import Board
+from engines import Engine, select_engine, time_budget
+from minimax import SearchLimits
+
+MIN_SEARCH_TIME = 0.01  # budget given to requests whose deadline has already passed
+
+
+@dataclass
+class MoveRequest:
+    """One game asking for an AI move."""
+    request_id: int
+    board: Board
+    ai_symbol: str
+    human_symbol: str
+    difficulty: str = "medium"
+    time_limit: Optional[float] = None  # seconds; defaults to the difficulty's own limit
+    deadline: Optional[float] = None    # absolute time.time() by which the answer is needed
+
+
+@dataclass
+class MoveResult:
+    request_id: int
+    move: Optional[Tuple[int, int]]
+    elapsed: float
+    nodes: int
+    depth: int
+    deadline_missed: bool
+
+
+# Engines live for the whole worker process; keyed by (engine, difficulty, ai_symbol)
+# because table scores are stored from the AI side's point of view.
+_ENGINES: Dict[Tuple[str, str, str], Engine] = {}
+
+
+def _engine(board: Board, difficulty: str, ai_symbol: str, budget: Optional[float]) -> Engine:
+    spec = select_engine(board, difficulty, budget)
+    key = (spec.name, difficulty, ai_symbol)
+    ai = _ENGINES.get(key)
+    if ai is None:
+        ai = _ENGINES[key] = spec.create(difficulty)
+    return ai
+
+
+def serve_chunk(requests: List[MoveRequest]) -> List[MoveResult]:
+    """Search a chunk of requests in order with shared engines. Runs in a worker process."""
+    results = []
+    for req in requests:
+        budget = req.time_limit if req.time_limit is not None else time_budget(req.difficulty)
+        start = time.time()
+        if req.deadline is not None:
+            budget = min(budget, req.deadline - start)
+        ai = _engine(req.board, req.difficulty, req.ai_symbol, budget)
+        search = ai.search(req.board, req.ai_symbol, req.human_symbol,
+                           SearchLimits(time_limit=max(budget, MIN_SEARCH_TIME)))
+        end = time.time()
+        results.append(MoveResult(
+            request_id=req.request_id,
+            move=search.move,
+            elapsed=end - start,
+            nodes=search.nodes,
+            depth=search.depth,
+            deadline_missed=req.deadline is not None and end > req.deadline,
+        ))
+    return results
+
+
+class EngineService:
+    """Schedules batches of move requests over a pool of engine workers."""
+
+    def __init__(self, workers: Optional[int] = None, chunk_size: int = 4) -> None:
+        self._workers = (os.cpu_count() or 1) if workers is None else workers
+        self._chunk_size = max(1, chunk_size)
+        self._pool = ProcessPoolExecutor(max_workers=self._workers) if self._workers > 0 else None
+
+    def close(self) -> None:
+        if self._pool:
+            self._pool.shutdown()
+
+    def __enter__(self) -> "EngineService":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _chunks(self, requests: Iterable[MoveRequest]) -> List[List[MoveRequest]]:
+        """Earliest deadline first, dealt round-robin so urgent requests start on different workers."""
+        ordered = sorted(requests, key=lambda r: (r.deadline if r.deadline is not None else float("inf"), r.request_id))
+        if not ordered:
+            return []
+        n_chunks = max(1, -(-len(ordered) // self._chunk_size))
+        chunks: List[List[MoveRequest]] = [[] for _ in range(n_chunks)]
+        for req, chunk in zip(ordered, itertools.cycle(chunks)):
+            chunk.append(req)
+        return chunks
+
+    def run_batch(self, requests: Iterable[MoveRequest]) -> Iterator[MoveResult]:
+        """Yield a MoveResult for every request as soon as its chunk is done."""
+        chunks = self._chunks(requests)
+        if self._pool is None:
+            for chunk in chunks:
+                yield from serve_chunk(chunk)
+            return
+
+        pending: List[Future] = [self._pool.submit(serve_chunk, chunk) for chunk in chunks]
+        while pending:
+            done, not_done = wait(pending, return_when=FIRST_COMPLETED)
+            pending = list(not_done)
+            for fut in done:
+                yield from fut.result()
+
+    def best_moves(self, requests: Iterable[MoveRequest]) -> Dict[int, MoveResult]:
+        """Convenience wrapper: run a batch and index the results by request_id."""
+        return {res.request_id: res for res in self.run_batch(requests)}
@@ -0,0 +1,265 @@
+# engines.py
+"""Engine interface, registry and per-move engine selection.
+
+Every engine answers `search(board, ai_symbol, human_symbol, limits)` with
+a SearchResult. Engines are registered with the difficulties they can play
+and a cost model (estimated seconds per move for a board); `select_engine()`
+picks the cheapest engine for the difficulty that fits the time budget:
+
+    spec = select_engine(board, "hard")
+    engine = spec.create("hard")
+    move = engine.get_best_move(board, "O", "X")
+
+The difficulties an engine is registered for are its strength gate: the
+exhaustive solver plays perfectly, so it only stands in for "hard", never
+for "medium". `create_engine(difficulty)` gives the position-independent
+engine of a difficulty (random, Q-learning or minimax).
+"""
+import collections
+import math
+import random
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Protocol, Tuple
+
+from board import Board
+from minimax import SEARCH_DEPTHS, SEARCH_TIME_LIMITS, MinimaxAI, SearchLimits, SearchResult
+
+SOLVER_MAX_EMPTY = 12  # the exhaustive solver is only considered with this few empty cells
+SEARCH_NPS = 2000.0    # conservative nodes/sec of the pure-Python search, for cost estimates
+
+
+class Engine(Protocol):
+    """Anything that can choose a move for one side."""
+
+    last_result: Optional[SearchResult]
+
+    def search(self, board: Board, ai_symbol: str, human_symbol: str,
+               limits: Optional[SearchLimits] = None) -> SearchResult: ...
+
+    def get_best_move(self, board: Board, ai_symbol: str, human_symbol: str,
+                      limits: Optional[SearchLimits] = None) -> Optional[Tuple[int, int]]: ...
+
+
+# -------- engines ----------------------------------------------------------
+
+class RandomEngine:
+    """Plays a uniformly random legal move instantly (draws from the global generator)."""
+
+    def __init__(self, difficulty: str = "fast") -> None:
+        self.difficulty = difficulty
+        self.search_time_limit = SEARCH_TIME_LIMITS[difficulty]
+        self.last_result: Optional[SearchResult] = None
+
+    def search(self, board: Board, ai_symbol: str, human_symbol: str,
+               limits: Optional[SearchLimits] = None) -> SearchResult:
+        start = time.monotonic()
+        legal_moves = list(board.legal)
+        result = SearchResult(move=random.choice(legal_moves) if legal_moves else None, difficulty=self.difficulty)
+        result.elapsed = time.monotonic() - start
+        self.last_result = result
+        return result
+
+    def get_best_move(self, board: Board, ai_symbol: str, human_symbol: str,
+                      limits: Optional[SearchLimits] = None) -> Optional[Tuple[int, int]]:
+        return self.search(board, ai_symbol, human_symbol, limits).move
+
+
+def _q_row() -> Dict[Tuple[int, int], float]:
+    """Q-table row factory (module level so the table pickles)."""
+    return collections.defaultdict(float)
+
+
+class QLearningEngine:
+    """Epsilon-greedy play from a Q-table keyed by canonical positions (draws from the global generator)."""
+
+    def __init__(self, difficulty: str = "easy") -> None:
+        self.difficulty = difficulty
+        self.search_time_limit = SEARCH_TIME_LIMITS[difficulty]
+        self.last_result: Optional[SearchResult] = None
+        self.q_table = collections.defaultdict(_q_row)  # state -> (row, col) -> Q, any board size
+        self.learning_rate = 0.1
+        self.discount_factor = 0.9
+        self.exploration_rate = 0.4
+        self.exploration_decay = 0.995
+        self.min_exploration_rate = 0.05
+        self.last_state = None
+        self.last_action = None
+
+    def search(self, board: Board, ai_symbol: str, human_symbol: str,
+               limits: Optional[SearchLimits] = None) -> SearchResult:
+        start = time.monotonic()
+        result = SearchResult(move=self._get_q_learning_move(board, ai_symbol, human_symbol),
+                              difficulty=self.difficulty)
+        result.elapsed = time.monotonic() - start
+        self.last_result = result
+        return result
+
+    def get_best_move(self, board: Board, ai_symbol: str, human_symbol: str,
+                      limits: Optional[SearchLimits] = None) -> Optional[Tuple[int, int]]:
+        return self.search(board, ai_symbol, human_symbol, limits).move
+
+    def _get_state_representation(self, board: Board) -> int:
+        """Hashable key of the board state for the Q-table (its canonical Zobrist hash, obstacles included)."""
+        return board.canonical()[0]
+
+    def _get_q_learning_move(self, board: Board, ai_symbol: str, human_symbol: str) -> Optional[Tuple[int, int]]:
+        state, sym = board.canonical()  # actions are keyed in the canonical frame
+        legal_moves = list(board.legal)
+
+        if not legal_moves:
+            return None
+
+        # Epsilon-greedy strategy
+        if random.uniform(0, 1) < self.exploration_rate:
+            move = random.choice(legal_moves)
+        else:
+            q_values = self.q_table[state]
+
+            legal_q_values = []
+            legal_actions = []
+            for r, c in legal_moves:
+                legal_q_values.append(q_values[board.to_canonical(sym, (r, c))])
+                legal_actions.append((r, c))
+
+            if not legal_actions:
+                move = random.choice(list(board.legal))
+            else:
+                max_q_value = -math.inf
+                best_legal_moves = []
+                for i, qv in enumerate(legal_q_values):
+                    if qv > max_q_value:
+                        max_q_value = qv
+                        best_legal_moves = [legal_actions[i]]
+                    elif qv == max_q_value:
+                        best_legal_moves.append(legal_actions[i])
+                move = random.choice(best_legal_moves)
+
+        self.last_state = state
+        self.last_action = board.to_canonical(sym, move)
+        self.exploration_rate = max(self.min_exploration_rate, self.exploration_rate * self.exploration_decay)
+        return move
+
+    def update_q_table(self, old_board: Board, new_board: Board, ai_symbol: str, human_symbol: str, reward: float):
+        """Update Q-table. (Requires external call from controller for full learning)"""
+        if self.last_state is None or self.last_action is None:
+            return
+
+        old_state = self.last_state
+        action_idx = self.last_action
+
+        new_state, new_sym = new_board.canonical()
+        current_q_value = self.q_table[old_state][action_idx]
+
+        next_legal_moves_indices = []
+        for r, c in new_board.legal:
+            next_legal_moves_indices.append(new_board.to_canonical(new_sym, (r, c)))
+
+        if next_legal_moves_indices:
+            max_next_q = max(self.q_table[new_state][idx] for idx in next_legal_moves_indices)
+        else:
+            max_next_q = 0.0
+
+        updated_q_value = current_q_value + self.learning_rate * (
+            reward + self.discount_factor * max_next_q - current_q_value
+        )
+        self.q_table[old_state][action_idx] = updated_q_value
+
+        self.last_state = None
+        self.last_action = None
+
+    def get_reward(self, board: Board, ai_symbol: str, human_symbol: str) -> float:
+        if board.has_winner(ai_symbol):
+            return 1.0
+        if board.has_winner(human_symbol):
+            return -1.0
+        if board.is_full():
+            return 0.5
+        return 0.0
+
+
+class SolverEngine(MinimaxAI):
+    """Alpha-beta to the end of the game over every empty cell; exact on small boards."""
+
+    def search(self, board: Board, ai_symbol: str, human_symbol: str,
+               limits: Optional[SearchLimits] = None, multi_pv: int = 1, publish: bool = True) -> SearchResult:
+        self.max_depth = max(1, len(board.legal))
+        self.root_radius = self.inner_radius = max(board.rows, board.cols)
+        return super().search(board, ai_symbol, human_symbol, limits, multi_pv, publish)
+
+
+# -------- registry ---------------------------------------------------------
+
+@dataclass
+class EngineSpec:
+    name: str
+    factory: Callable[[str], Engine]           # difficulty -> engine
+    difficulties: Tuple[str, ...]              # difficulties this engine may play
+    cost: Callable[[Board, str], float]        # estimated seconds per move
+
+    def create(self, difficulty: str) -> Engine:
+        return self.factory(difficulty)
+
+
+_REGISTRY: Dict[str, EngineSpec] = {}
+# The engine each difficulty falls back to whatever the position
+DEFAULT_ENGINES = {"fast": "random", "easy": "qlearning", "medium": "minimax", "hard": "minimax"}
+
+
+def register_engine(name: str, factory: Callable[[str], Engine], difficulties: Tuple[str, ...],
+                    cost: Callable[[Board, str], float]) -> EngineSpec:
+    """Add (or replace) an engine; later solver/MCTS engines plug in here."""
+    spec = _REGISTRY[name] = EngineSpec(name, factory, difficulties, cost)
+    return spec
+
+
+def engines() -> List[EngineSpec]:
+    return list(_REGISTRY.values())
+
+
+def get_engine(name: str) -> EngineSpec:
+    return _REGISTRY[name]
+
+
+def create_engine(difficulty: str) -> Engine:
+    """A new instance of the engine that plays `difficulty` on any position."""
+    return get_engine(DEFAULT_ENGINES[difficulty]).create(difficulty)
+
+
+def time_budget(difficulty: str) -> float:
+    """The per-move time limit a difficulty has always had."""
+    return SEARCH_TIME_LIMITS[difficulty]
+
+
+def _solver_cost(board: Board, difficulty: str) -> float:
+    empty = len(board.legal)
+    if not board.bounded or empty > SOLVER_MAX_EMPTY:  # an unbounded game never runs out of moves
+        return math.inf
+    # alpha-beta with good ordering visits roughly the square root of the full game tree
+    return math.sqrt(math.factorial(empty)) / SEARCH_NPS
+
+
+def _minimax_cost(board: Board, difficulty: str) -> float:
+    # Iterative deepening runs until the time limit, unless the depth cap (or the
+    # end of the game) comes first: about sqrt(b ** depth) nodes for b empty cells
+    empty = len(board.legal)
+    depth = min(SEARCH_DEPTHS[difficulty], empty)
+    return min(time_budget(difficulty), math.sqrt(float(empty) ** depth) / SEARCH_NPS)
+
+
+register_engine("random", RandomEngine, ("fast",), lambda board, difficulty: 0.0)
+register_engine("qlearning", QLearningEngine, ("easy",), lambda board, difficulty: 1e-6 * len(board.legal))
+register_engine("solver", SolverEngine, ("hard",), _solver_cost)  # perfect play: too strong for "medium"
+register_engine("minimax", MinimaxAI, ("medium", "hard"), _minimax_cost)
+
+
+def select_engine(board: Board, difficulty: str, budget: Optional[float] = None) -> EngineSpec:
+    """Cheapest registered engine for `difficulty` whose estimated cost fits `budget` seconds."""
+    if budget is None:
+        budget = time_budget(difficulty)
+    candidates = [(spec.cost(board, difficulty), spec) for spec in _REGISTRY.values()
+                  if difficulty in spec.difficulties]
+    if not candidates:
+        raise ValueError(f"no engine registered for difficulty {difficulty!r}")
+    feasible = [c for c in candidates if c[0] <= budget]
+    return min(feasible or candidates, key=lambda c: c[0])[1]
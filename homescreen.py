@@ -14,7 +14,7 @@ from kivy.app import App
 from kivy.metrics import dp
 from kivy.core.text import LabelBase
 from utils import style_round_button
-from themes import Theme
+from themes import get_theme
 
 # Register Segoe UI Emoji font
 LabelBase.register(name='SegoeUIEmoji', fn_regular='assets/fonts/segoeuiemoji.ttf')
@@ -25,7 +25,7 @@ class HomeScreen(Screen):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.current_theme = "wood"  # Default theme
-        self.theme_obj = Theme(self.current_theme)  # Initialize theme
+        self.theme_obj = get_theme(self.current_theme)  # Initialize theme
         self.current_mode = "friend"
         self.current_difficulty = "medium"
         self.selected_mode_btn = ObjectProperty(None)
@@ -38,7 +38,7 @@ class HomeScreen(Screen):
         # Themed background with gradient overlay
         with self.root.canvas.before:
             Color(0, 0, 0, 0.3)  # Subtle dark overlay for contrast
-            self.bg = Rectangle(source=self.theme_obj.bg, pos=self.root.pos, size=self.root.size)
+            self.bg = Rectangle(texture=self.theme_obj.texture("bg"), pos=self.root.pos, size=self.root.size)
         self.root.bind(size=self._update_bg, pos=self._update_bg)
 
         # Main content layout with balanced proportions
@@ -272,10 +272,8 @@ class HomeScreen(Screen):
             button.selection_border.rectangle = (button.x, button.y, size[0], size[1])
 
     def _update_bg(self, *args):
-        """Update background with current theme."""
-        if hasattr(self, 'bg') and hasattr(self, 'theme_obj'):
-            self.theme_obj = Theme(self.current_theme)
-            self.bg.source = self.theme_obj.bg
+        """Follow the root's size/pos; the theme (and its texture) only changes in _set_theme."""
+        if hasattr(self, 'bg'):
             self.bg.pos = self.root.pos
             self.bg.size = self.root.size
 
@@ -307,6 +305,8 @@ class HomeScreen(Screen):
         self.current_theme = theme
         self._update_button_selection(button)
         self.selected_theme_btn = button
+        self.theme_obj = get_theme(theme)
+        self.bg.texture = self.theme_obj.texture("bg")
         self._update_bg()
 
     def _start_game(self, *args):
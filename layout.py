@@ -16,7 +16,7 @@ from controller import GameController, GameState, GameObserver
 from board import Board
 from themes import Theme
 from sound_manager import SoundManager
-from widgets_board import BoardWidget, CELL_SIZE
+from widgets_board import CELL_SIZE, ViewportBoardWidget, make_board_widget
 from utils import style_round_button
 
 
@@ -40,11 +40,11 @@ class TicTacToeLayout(FloatLayout):
 
         # Background
         with self.canvas.before:
-            self._bg = Rectangle(source=self._theme.bg, pos=self.pos, size=self.size)
+            self._bg = Rectangle(texture=self._theme.texture("bg"), pos=self.pos, size=self.size)
         self.bind(size=self._update_bg, pos=self._update_bg) 
         
         # Board
-        self._grid = BoardWidget(self._board, self._on_cell, self._theme)
+        self._grid = make_board_widget(self._board, self._on_cell, self._theme)
         self.add_widget(self._grid)
         # pos_hint sẽ được đặt trong _update_board_layout
 
@@ -74,8 +74,10 @@ class TicTacToeLayout(FloatLayout):
         self.add_widget(self._home_button)
         
         # Cập nhật bố cục ban đầu và liên kết với sự kiện thay đổi kích thước cửa sổ
+        # (at most one relayout per frame, however many size events arrive)
         self._update_board_layout(self.size, self.pos)
-        self.bind(size=self._update_board_layout)
+        self._layout_trigger = Clock.create_trigger(self._update_board_layout)
+        self.bind(size=self._layout_trigger)
 
     def _update_bg(self, *args):
         self._bg.pos = self.pos
@@ -93,18 +95,11 @@ class TicTacToeLayout(FloatLayout):
         available_height_for_board = size[1] - status_bar_height - button_height - (2 * vertical_padding)
         available_width_for_board = size[0]
 
-        optimal_cell_size_w = available_width_for_board / self._board.cols if self._board.cols > 0 else 1
-        optimal_cell_size_h = available_height_for_board / self._board.rows if self._board.rows > 0 else 1
-        
-        scaled_cell_size = min(optimal_cell_size_w, optimal_cell_size_h)
-        
-        min_abs_cell_size = 50
-        scaled_cell_size = max(scaled_cell_size, min_abs_cell_size)
-
-        self._grid.size = (self._board.cols * scaled_cell_size, self._board.rows * scaled_cell_size)
-        
-        for cell in self._grid.children:
-            cell.size = (scaled_cell_size, scaled_cell_size)
+        if isinstance(self._grid, ViewportBoardWidget):
+            # The viewport takes the whole free area and zooms/culls itself: no minimum cell size
+            self._grid.size = (available_width_for_board, max(available_height_for_board, 0))
+        else:
+            self._size_board_cells(available_width_for_board, available_height_for_board)
             
         board_area_bottom = button_height + vertical_padding
         board_area_top = size[1] - status_bar_height - vertical_padding
@@ -118,6 +113,17 @@ class TicTacToeLayout(FloatLayout):
         self._home_button.pos_hint = {'x': 0.02, 'y': 0.01}
         self._restart_button.pos_hint = {'right': 0.98, 'y': 0.01}
 
+    def _size_board_cells(self, available_width_for_board, available_height_for_board):
+        optimal_cell_size_w = available_width_for_board / self._board.cols if self._board.cols > 0 else 1
+        optimal_cell_size_h = available_height_for_board / self._board.rows if self._board.rows > 0 else 1
+        
+        scaled_cell_size = min(optimal_cell_size_w, optimal_cell_size_h)
+        
+        min_abs_cell_size = 50
+        scaled_cell_size = max(scaled_cell_size, min_abs_cell_size)
+
+        self._grid.set_cell_size(scaled_cell_size)
+
     # --------------------------- UI events -------------------------------- #
     def _on_cell(self, row, col):
         self._controller.play(row, col)
@@ -138,6 +144,9 @@ class TicTacToeLayout(FloatLayout):
         if self._sounds.tap:
             self._sounds.play_tap()
 
+    def on_board_sync(self) -> None:
+        self._grid.reset(self._board)
+
     def on_state_change(self, state: GameState, next_turn: Optional[str]) -> None:
         if state is GameState.IN_PROGRESS:
             self.status_message = f"{next_turn}'s turn"
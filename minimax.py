@@ -1,139 +1,545 @@
-import collections
+import asyncio
+import json
 import math
+import os
 import random
+import threading
 import time
-from typing import List, Optional, Tuple
+from dataclasses import asdict, dataclass, field
+from typing import AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
 
 from board import Board
+from profiling import instrument
+from tracer import TT_CUTOFF, TT_HIT, TT_MISS, SearchTracer, default_tracer
 
 # Constants for Transposition Table node types (optional, but good for robustness)
 EXACT, LOWER_BOUND, UPPER_BOUND = 0, 1, 2
 
+# Tables are cleared when they grow past these sizes (checked once per move)
+MAX_TT_ENTRIES = 500_000
+MAX_EVAL_CACHE_ENTRIES = 200_000
+
+# Principal Variation Search tuning (only used when MinimaxAI(pvs=True))
+WIN_SCORE = 1_000_000_000      # terminal scores are WIN_SCORE + depth; no aspiration around them
+ASPIRATION_MIN_WINDOW = 1_000  # half-width of the root window around the previous iteration's score
+ASPIRATION_FRACTION = 0.25     # ... or this share of the score's magnitude, whichever is larger
+LMR_MIN_DEPTH = 3              # late-move reductions only with this much depth left
+LMR_MIN_INDEX = 3              # and only from the (n+1)-th ordered move on
+
+# Without an explicit soft limit, no new iteration starts after this share of the time limit
+SOFT_TIME_FRACTION = 0.5
+
+# Giới hạn thời gian tìm kiếm cho mỗi nước đi (giây): the per-move budget of every
+# difficulty, whichever engine plays it (see engines.time_budget)
+SEARCH_TIME_LIMITS = {
+    "hard": 5.0,    # Tăng đáng kể thời gian cho hard để tìm kiếm sâu hơn
+    "medium": 1.0,
+    "easy": 0.1,
+    "fast": 0.01,   # Rất nhỏ để đảm bảo không có suy nghĩ
+}
+
+# Iterative deepening depth cap of the difficulties MinimaxAI plays
+SEARCH_DEPTHS = {
+    "hard": 10,     # Tăng độ sâu hơn nữa cho hard, IDS và TT sẽ quản lý
+    "medium": 4,
+}
+
+# Set to a file path to append one JSON line per search (see JsonLinesSink)
+SEARCH_STATS_ENV = "TTT_SEARCH_STATS"
+
+# Evaluation parameters written by tuner.py; read once at startup if the file exists
+EVAL_PARAMS_ENV = "TTT_EVAL_PARAMS"
+DEFAULT_EVAL_PARAMS_FILE = "eval_params.json"
+
+
+@dataclass
+class IterationInfo:
+    """Outcome of one completed iterative deepening iteration."""
+    depth: int
+    move: Optional[Tuple[int, int]]
+    score: float
+    nodes: int
+    elapsed: float
+    pv: List[Tuple[int, int]] = field(default_factory=list)
+    multipv: List["PVLine"] = field(default_factory=list)  # top-K root moves when multi_pv > 1
+
+
+@dataclass
+class PVLine:
+    """One ranked root move of a multi-PV search."""
+    move: Tuple[int, int]
+    score: float
+    pv: List[Tuple[int, int]] = field(default_factory=list)
+
+
+@dataclass
+class SearchResult:
+    """Everything one get_best_move call found out, for telemetry and tuning."""
+    move: Optional[Tuple[int, int]]
+    score: float = 0.0
+    pv: List[Tuple[int, int]] = field(default_factory=list)
+    multipv: List[PVLine] = field(default_factory=list)
+    depth: int = 0  # deepest completed iteration
+    iterations: List[IterationInfo] = field(default_factory=list)
+    nodes: int = 0
+    leaves: int = 0
+    cutoffs: int = 0
+    tt_probes: int = 0
+    tt_hits: int = 0
+    elapsed: float = 0.0
+    timed_out: bool = False
+    difficulty: str = ""
+    pondered: bool = False  # played from a background search; elapsed is the reply latency only
+
+    @property
+    def tt_hit_rate(self) -> float:
+        return self.tt_hits / self.tt_probes if self.tt_probes else 0.0
+
+    @property
+    def nps(self) -> float:
+        return self.nodes / self.elapsed if self.elapsed > 0 else 0.0
+
+    def to_dict(self) -> dict:
+        d = asdict(self)
+        # JSON has no infinities; mate scores are finite, so these only mark "no score"
+        for item in [d] + d["iterations"] + d["multipv"]:
+            if isinstance(item["score"], float) and math.isinf(item["score"]):
+                item["score"] = None
+        return d
+
+
+@dataclass
+class SearchLimits:
+    """When a search must stop. Unset fields fall back to the difficulty's defaults.
+
+    The clock is only polled every `check_every` nodes (time.monotonic), and
+    no new iteration starts once `soft_time_limit` has passed. Hitting a hard
+    limit aborts the iteration in progress and the result of the last
+    completed iteration is returned.
+    """
+    time_limit: Optional[float] = None       # hard limit, seconds from the start of the search
+    soft_time_limit: Optional[float] = None  # don't start another iteration after this many seconds
+    deadline: Optional[float] = None         # absolute time.monotonic() hard deadline
+    max_nodes: Optional[int] = None
+    max_depth: Optional[int] = None
+    check_every: int = 8                     # nodes between clock polls
+    should_stop: Optional[Callable[[], bool]] = None  # polled with the clock; True aborts the search
+
+
+class _SearchAborted(Exception):
+    """Raised inside the tree when a hard limit is hit; caught at the root."""
+
+
+class JsonLinesSink:
+    """Appends every SearchResult as one JSON line to a file."""
+
+    def __init__(self, path: str) -> None:
+        self._path = path
+
+    def __call__(self, result: SearchResult) -> None:
+        record = result.to_dict()
+        record["timestamp"] = time.time()
+        with open(self._path, "a", encoding="utf-8") as fh:
+            fh.write(json.dumps(record, separators=(",", ":")) + "\n")
+
+
+def _default_sink() -> Optional[Callable[[SearchResult], None]]:
+    path = os.environ.get(SEARCH_STATS_ENV)
+    return JsonLinesSink(path) if path else None
+
+
+@dataclass
+class EvalParams:
+    """Weights of the static evaluation and of root move ordering (tuned by tuner.py)."""
+    line_base: float = 100.0          # an open line of i stones scores line_base ** i
+    threat_n_minus_1: float = 100_000_000
+    threat_n_minus_2: float = 10_000_000
+    defence_factor: float = 1.5       # opponent lines weigh this much more than our own
+    adjacency_bonus: float = 5.0      # move ordering: per neighbouring stone
+    center_bonus: float = 50.0        # move ordering: for the exact centre, falling off linearly
+
+    def save(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(asdict(self), fh, indent=2)
+
+    @classmethod
+    def load(cls, path: str) -> "EvalParams":
+        with open(path, encoding="utf-8") as fh:
+            data = json.load(fh)
+        return cls(**{k: float(v) for k, v in data.items() if k in cls.__dataclass_fields__})
+
+
+_startup_params: Optional[EvalParams] = None
+
+
+def default_eval_params() -> EvalParams:
+    """Parameters from $TTT_EVAL_PARAMS (or ./eval_params.json), else the built-in ones; loaded once."""
+    global _startup_params
+    if _startup_params is None:
+        path = os.environ.get(EVAL_PARAMS_ENV, DEFAULT_EVAL_PARAMS_FILE)
+        _startup_params = EvalParams.load(path) if os.path.exists(path) else EvalParams()
+    return _startup_params
 
-class MinimaxAI:
-    """Minimax AI implementation for Tic Tac Toe with adjustable difficulty."""
 
-    def __init__(self, difficulty: str = "medium"):
+class MinimaxAI:
+    """Minimax AI implementation for Tic Tac Toe; plays "medium" and "hard" (engines.py has the others)."""
+
+    def __init__(self, difficulty: str = "medium",
+                 stats_sink: Optional[Callable[[SearchResult], None]] = None,
+                 tracer: Optional[SearchTracer] = None,
+                 pvs: bool = False,
+                 params: Optional[EvalParams] = None):
+        if difficulty not in SEARCH_DEPTHS:
+            raise ValueError(f"MinimaxAI plays {'/'.join(SEARCH_DEPTHS)}, not {difficulty!r} (see engines.create_engine)")
         self.difficulty = difficulty
+        self.params = params if params is not None else default_eval_params()
+        # Principal Variation Search with aspiration windows and late-move reductions;
+        # off by default so it can be compared against plain alpha-beta
+        self.pvs = pvs
         self.max_depth = self._get_max_depth()
+        # Neighbourhood searched around placed stones: at the root and inside the tree.
+        # Tăng search_radius cho chế độ hard để AI xem xét nhiều nước đi hơn
+        self.root_radius = 4 if self.difficulty == "hard" else 2
+        self.inner_radius = 3 if self.difficulty == "hard" else 1
 
-        # Q-learning for easy mode
-        if self.difficulty == "easy":
-            self.q_table = collections.defaultdict(lambda: [0.0] * (Board().rows * Board().cols))
-            self.learning_rate = 0.1
-            self.discount_factor = 0.9
-            self.exploration_rate = 0.4
-            self.exploration_decay = 0.995
-            self.min_exploration_rate = 0.05
-            self.last_state = None
-            self.last_action = None
-
-        # Giới hạn thời gian tìm kiếm cho mỗi nước đi (giây)
-        if self.difficulty == "hard":
-            self.search_time_limit = 5.0  # Tăng đáng kể thời gian cho hard để tìm kiếm sâu hơn
-        elif self.difficulty == "medium":
-            self.search_time_limit = 1.0
-        elif self.difficulty == "easy":
-            self.search_time_limit = 0.1
-        else:  # 'fast' mode or any other, for instant play
-            self.search_time_limit = 0.01 # Rất nhỏ để đảm bảo không có suy nghĩ
+        self.search_time_limit = SEARCH_TIME_LIMITS[difficulty]
 
         self.start_time = 0
-        self.transposition_table = {}
+        self.transposition_table = {}  # (hash, maximizing) -> (score, depth, node type, best move)
+        self.eval_cache = {}  # (zobrist hash, evaluating symbol) -> static evaluation
+
+        # Telemetry: the result of the last search and where to report it
+        self.stats_sink = stats_sink if stats_sink is not None else _default_sink()
+        self.last_result: Optional[SearchResult] = None
+
+        # Optional sampling tracer of visited nodes (TTT_TRACE enables a process-wide one)
+        self.tracer = tracer if tracer is not None else default_tracer()
+        self._root_depth = 0
+
+        # Search counters, reset at the start of every search
+        self.nodes = 0
+        self.leaves = 0
+        self.cutoffs = 0
+        self.tt_probes = 0
+        self.tt_hits = 0
+        self.timed_out = False
+        self._limits = SearchLimits()
+        self._hard_deadline = math.inf
+        self._soft_deadline = math.inf
+        self._next_check = 0
+        self._partial: Optional[Tuple[Tuple[int, int], float]] = None
+        self._root_best: Optional[Tuple[Tuple[int, int], float]] = None
+        self._multi_pv = 1
+
+        # Per-move profiling when TTT_PROFILE is set; otherwise search stays the plain method
+        self.search = instrument(self.search, f"search-{difficulty}")
+
+    def __getstate__(self) -> dict:
+        # The profiling wrapper is a closure over a bound method; re-create it on the other side
+        state = self.__dict__.copy()
+        state.pop("search", None)
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self.search = instrument(self.search, f"search-{self.difficulty}")
 
     def _get_max_depth(self) -> int:
         """Set search depth based on difficulty."""
-        if self.difficulty == "easy":
-            return 0  # Q-learning doesn't use depth
-        elif self.difficulty == "medium":
-            return 4
-        elif self.difficulty == "hard":
-            return 10  # Tăng độ sâu hơn nữa cho hard, IDS và TT sẽ quản lý
-        else: # 'fast' mode
-            return 0 # No search depth needed, just pick a random move
-
-    def get_best_move(self, board: Board, ai_symbol: str, human_symbol: str) -> Optional[Tuple[int, int]]:
-        """Get the best move using Iterative Deepening Search."""
-        if self.difficulty == "easy":
-            return self._get_q_learning_move(board, ai_symbol, human_symbol)
-        
-        # New 'fast' mode: AI plays instantly by picking a random legal move
-        if self.difficulty == "fast":
-            legal_moves = list(board._legal)
-            return random.choice(legal_moves) if legal_moves else None
-
-        self.start_time = time.time()
-        best_move_overall = None
+        return SEARCH_DEPTHS[self.difficulty]
 
-        # Determine search radius for the top level of get_best_move
-        # Tăng search_radius cho chế độ hard để AI xem xét nhiều nước đi hơn
-        search_radius_for_get_best_move = 4 if self.difficulty == "hard" else 2
-
-        # Iterative Deepening Loop
-        for current_depth in range(1, self.max_depth + 1):
-            if time.time() - self.start_time > self.search_time_limit:
-                break  # Time limit exceeded, stop deeper search
+    def default_limits(self) -> SearchLimits:
+        """The limits used when the caller passes none: this difficulty's time limit and depth."""
+        return SearchLimits(time_limit=self.search_time_limit,
+                            soft_time_limit=self.search_time_limit * SOFT_TIME_FRACTION,
+                            max_depth=self.max_depth)
 
-            current_best_score = -math.inf
-            current_best_move = None
+    def get_best_move(self, board: Board, ai_symbol: str, human_symbol: str,
+                      limits: Optional[SearchLimits] = None) -> Optional[Tuple[int, int]]:
+        """Get the best move using Iterative Deepening Search (details in self.last_result)."""
+        return self.search(board, ai_symbol, human_symbol, limits).move
 
-            relevant_moves = self._get_relevant_moves(board, search_radius=search_radius_for_get_best_move) #
-            if not relevant_moves:
-                relevant_moves = list(board._legal)
-                if not relevant_moves:
-                    return None
+    def search(self, board: Board, ai_symbol: str, human_symbol: str,
+               limits: Optional[SearchLimits] = None, multi_pv: int = 1, publish: bool = True) -> SearchResult:
+        """Run a search and return the move together with its statistics.
 
-            # Sort moves using heuristic for better Alpha-Beta pruning (most promising moves first)
-            relevant_moves.sort(
-                key=lambda move: self._evaluate_move_potential(board, move, ai_symbol, human_symbol), reverse=True
-            )
+        With multi_pv > 1 the result also ranks the best `multi_pv` root moves with exact scores.
+        With publish=False (background searches) last_result and the stats sink are left alone.
+        """
+        start = time.monotonic()
+        result = self._iterative_deepening(board, ai_symbol, human_symbol, self._resolve_limits(limits), multi_pv)
+        result.elapsed = time.monotonic() - start
+        result.difficulty = self.difficulty
+
+        if publish:
+            self.publish(result)
+        return result
+
+    def publish(self, result: SearchResult) -> None:
+        """Make `result` the engine's last_result and hand it to the stats sink."""
+        self.last_result = result
+        if self.stats_sink is not None:
+            self.stats_sink(result)
+
+    def _resolve_limits(self, limits: Optional[SearchLimits]) -> SearchLimits:
+        """Fill unset fields of `limits` from the difficulty defaults."""
+        defaults = self.default_limits()
+        if limits is None:
+            return defaults
+        time_limit = limits.time_limit
+        if time_limit is None and limits.deadline is None:
+            time_limit = defaults.time_limit
+        soft = limits.soft_time_limit
+        if soft is None and time_limit is not None:
+            soft = time_limit * SOFT_TIME_FRACTION
+        return SearchLimits(
+            time_limit=time_limit,
+            soft_time_limit=soft,
+            deadline=limits.deadline,
+            max_nodes=limits.max_nodes,
+            max_depth=limits.max_depth if limits.max_depth is not None else defaults.max_depth,
+            check_every=max(1, limits.check_every),
+            should_stop=limits.should_stop,
+        )
 
-            # If a best move was found in a shallower search, prioritize it
-            if best_move_overall and best_move_overall in relevant_moves:
-                relevant_moves.remove(best_move_overall)
-                relevant_moves.insert(0, best_move_overall)
+    def _check_limits(self) -> None:
+        """Poll the clock / node budget / stop flag; raise _SearchAborted when a hard limit is hit."""
+        limits = self._limits
+        self._next_check = self.nodes + limits.check_every
+        if (time.monotonic() >= self._hard_deadline
+                or (limits.max_nodes is not None and self.nodes >= limits.max_nodes)
+                or (limits.should_stop is not None and limits.should_stop())):
+            self.timed_out = True
+            raise _SearchAborted()
+
+    def iter_search(self, board: Board, ai_symbol: str, human_symbol: str,
+                    limits: Optional[SearchLimits] = None, multi_pv: int = 1) -> Iterator[IterationInfo]:
+        """Yield an IterationInfo after every completed iterative deepening iteration.
+
+        The consumer may stop at any time (break / close()); the board is
+        always back at the root position between yields.
+        """
+        self._begin_search(self._resolve_limits(limits), multi_pv)
+        yield from self._deepen(board, ai_symbol, human_symbol)
+
+    async def aiter_search(self, board: Board, ai_symbol: str, human_symbol: str,
+                           limits: Optional[SearchLimits] = None, multi_pv: int = 1) -> AsyncIterator[IterationInfo]:
+        """Async version of iter_search; iterations run in the default executor."""
+        limits = limits or SearchLimits()
+        stopped = False
+        caller_stop = limits.should_stop
+
+        def should_stop() -> bool:
+            return stopped or (caller_stop is not None and caller_stop())
+
+        limits = SearchLimits(**{**limits.__dict__, "should_stop": should_stop})
+        it = self.iter_search(board, ai_symbol, human_symbol, limits, multi_pv)
+        loop = asyncio.get_running_loop()
+        done = object()
+        step_done = threading.Event()  # set when the executor thread has left the generator
+
+        def step():
+            try:
+                return next(it, done)
+            finally:
+                step_done.set()
+
+        try:
+            while True:
+                step_done.clear()
+                info = await loop.run_in_executor(None, step)
+                if info is done:
+                    return
+                yield info
+        finally:
+            # Stop a step still running in the executor and wait for it to leave the board and
+            # tables (cancelling the awaiting future doesn't stop the thread), so the caller
+            # never shares them with a search it has walked away from
+            stopped = True
+            if not step_done.is_set():
+                await asyncio.shield(loop.run_in_executor(None, step_done.wait))
+            it.close()
+
+    def _begin_search(self, limits: SearchLimits, multi_pv: int = 1) -> None:
+        """Reset counters and deadlines for a new search."""
+        self.start_time = time.monotonic()
+        self._limits = limits
+        self._multi_pv = max(1, multi_pv)
+        self._hard_deadline = math.inf
+        if limits.time_limit is not None:
+            self._hard_deadline = self.start_time + limits.time_limit
+        if limits.deadline is not None:
+            self._hard_deadline = min(self._hard_deadline, limits.deadline)
+        self._soft_deadline = self._hard_deadline
+        if limits.soft_time_limit is not None:
+            self._soft_deadline = min(self._soft_deadline, self.start_time + limits.soft_time_limit)
+        self._next_check = limits.check_every
+
+        if len(self.transposition_table) > MAX_TT_ENTRIES:
+            self.transposition_table.clear()
+        if len(self.eval_cache) > MAX_EVAL_CACHE_ENTRIES:
+            self.eval_cache.clear()
+        self.nodes = 0
+        self.leaves = 0
+        self.cutoffs = 0
+        self.tt_probes = 0
+        self.tt_hits = 0
+        self.timed_out = False
+        self._partial: Optional[Tuple[Tuple[int, int], float]] = None
+
+    def _iterative_deepening(self, board: Board, ai_symbol: str, human_symbol: str,
+                             limits: SearchLimits, multi_pv: int = 1) -> SearchResult:
+        self._begin_search(limits, multi_pv)
+        iterations = list(self._deepen(board, ai_symbol, human_symbol))
+
+        if iterations:
+            best_move_overall, best_score_overall = iterations[-1].move, iterations[-1].score
+        elif self._partial is not None:
+            # No iteration finished; a partly searched first iteration still beats a random move
+            best_move_overall, best_score_overall = self._partial
+        else:
+            best_move_overall, best_score_overall = None, -math.inf
+        if not best_move_overall:
+            best_move_overall = random.choice(list(board.legal)) if board.legal else None
+        return SearchResult(
+            move=best_move_overall,
+            score=best_score_overall,
+            pv=iterations[-1].pv if iterations else self._principal_variation(board, best_move_overall, ai_symbol, human_symbol),
+            multipv=iterations[-1].multipv if iterations else [],
+            depth=iterations[-1].depth if iterations else 0,
+            iterations=iterations,
+            nodes=self.nodes,
+            leaves=self.leaves,
+            cutoffs=self.cutoffs,
+            tt_probes=self.tt_probes,
+            tt_hits=self.tt_hits,
+            timed_out=self.timed_out,
+        )
 
-            # Initialize current_best_move if relevant_moves is not empty
-            if relevant_moves:
-                current_best_move = relevant_moves[0]
+    def _deepen(self, board: Board, ai_symbol: str, human_symbol: str) -> Iterator[IterationInfo]:
+        """Iterative deepening loop; yields each completed iteration."""
+        limits = self._limits
+        best_move_overall = None
+        previous_score: Optional[float] = None
 
-            for move in relevant_moves:
-                if time.time() - self.start_time > self.search_time_limit:
-                    break  # Time limit exceeded during move iteration at current depth
+        # The root list is generated and heuristically sorted once per search;
+        # later iterations reorder it by the scores of the previous one.
+        relevant_moves = self._get_relevant_moves(board, search_radius=self.root_radius) #
+        if not relevant_moves:
+            relevant_moves = list(board.legal)
+            if not relevant_moves:
+                return
+        relevant_moves.sort(
+            key=lambda move: self._evaluate_move_potential(board, move, ai_symbol, human_symbol), reverse=True
+        )
 
-                board.place(move[0], move[1], ai_symbol) #
-                score = self._minimax(board, current_depth - 1, -math.inf, math.inf, False, ai_symbol, human_symbol) #
+        # Iterative Deepening Loop
+        for current_depth in range(1, limits.max_depth + 1):
+            if current_depth > 1 and time.monotonic() >= self._soft_deadline:
+                return  # Not enough time left to finish another iteration
+
+            self._root_depth = current_depth
+            self._root_best = None
+            root_scores: Dict[Tuple[int, int], float] = {}
+            try:
+                if self.pvs and self._multi_pv == 1:
+                    current_best_move, current_best_score = self._search_root_pvs(
+                        board, relevant_moves, current_depth, previous_score, ai_symbol, human_symbol, root_scores)
+                else:
+                    current_best_move, current_best_score = self._search_root(
+                        board, relevant_moves, current_depth, ai_symbol, human_symbol, root_scores)
+            except _SearchAborted:
+                if best_move_overall is None:
+                    self._partial = self._root_best or (relevant_moves[0], -math.inf)
+                return
+
+            # Best-scoring moves first next time; moves never searched keep their order
+            relevant_moves.sort(key=lambda move: root_scores.get(move, -math.inf), reverse=True)
+
+            best_move_overall = current_best_move
+            previous_score = current_best_score
+            yield IterationInfo(current_depth, current_best_move, current_best_score, self.nodes,
+                                time.monotonic() - self.start_time,
+                                self._principal_variation(board, current_best_move, ai_symbol, human_symbol),
+                                self._multi_pv_lines(board, relevant_moves, root_scores, ai_symbol, human_symbol))
+
+    def _search_root(self, board: Board, moves: List[Tuple[int, int]], depth: int, ai_symbol: str,
+                     human_symbol: str, root_scores: Dict[Tuple[int, int], float]) -> Tuple[Tuple[int, int], float]:
+        """Root search keeping the K best exact scores (K = multi-PV count): alpha is the K-th best so far."""
+        best_move, best_score = moves[0], -math.inf
+        top: List[float] = []  # best K scores so far, descending
+        for move in moves:
+            self._check_limits()
+            alpha = top[-1] if len(top) >= self._multi_pv else -math.inf
+            board.place(move[0], move[1], ai_symbol) #
+            try:
+                score = self._minimax(board, depth - 1, alpha, math.inf, False, ai_symbol, human_symbol) #
+            finally:
                 board.undo_place(move[0], move[1]) #
-
-                if score > current_best_score:
-                    current_best_score = score
-                    current_best_move = move
-
-            if current_best_move:
-                best_move_overall = current_best_move
-            else:
-                pass
-
-        return best_move_overall if best_move_overall else (random.choice(list(board._legal)) if board._legal else None)
+            root_scores[move] = score
+            if score > alpha:
+                top.append(score)
+                top.sort(reverse=True)
+                del top[self._multi_pv:]
+            if score > best_score:
+                best_move, best_score = move, score
+                self._root_best = (move, score)
+        return best_move, best_score
+
+    def _multi_pv_lines(self, board: Board, ordered_moves: List[Tuple[int, int]], root_scores: Dict[Tuple[int, int], float],
+                        ai_symbol: str, human_symbol: str) -> List[PVLine]:
+        if self._multi_pv <= 1:
+            return []
+        return [PVLine(move, root_scores[move], self._principal_variation(board, move, ai_symbol, human_symbol))
+                for move in ordered_moves[:self._multi_pv] if move in root_scores]
+
+    def _principal_variation(self, board: Board, first_move: Optional[Tuple[int, int]],
+                             ai_symbol: str, human_symbol: str, max_len: int = 20) -> List[Tuple[int, int]]:
+        """Follow best moves stored in the transposition table from the root."""
+        pv: List[Tuple[int, int]] = []
+        move, maximizing = first_move, True
+        while move is not None and len(pv) < max_len and board.is_legal(*move):
+            board.place(move[0], move[1], ai_symbol if maximizing else human_symbol)
+            pv.append(move)
+            maximizing = not maximizing
+            if board.has_winner(ai_symbol) or board.has_winner(human_symbol):
+                break
+            board_hash, sym = board.canonical()
+            entry = self.transposition_table.get((board_hash, maximizing))
+            move = board.from_canonical(sym, entry[3]) if entry and entry[3] is not None else None
+        for r, c in reversed(pv):
+            board.undo_place(r, c)
+        return pv
 
     def _minimax(self, board: Board, depth: int, alpha: float, beta: float, maximizing_player: bool, ai_symbol: str, human_symbol: str) -> float:
         """Minimax algorithm with Alpha-Beta Pruning and Transposition Table."""
 
-        # Check time limit
-        if time.time() - self.start_time > self.search_time_limit:
-            return self._evaluate_board(board, ai_symbol, human_symbol) #
+        self.nodes += 1
+        if self.nodes >= self._next_check:
+            self._check_limits()
+        tracer = self.tracer
+        entry_alpha, entry_beta = alpha, beta
 
-        # Use Zobrist hash from board object
-        board_hash = board.current_zobrist_hash #
+        # Canonical Zobrist hash: symmetric positions share one entry, its move kept in the canonical frame
+        board_hash, sym = board.canonical()
 
         # Transposition table lookup (key includes player to differentiate identical board states for different players)
         tt_key = (board_hash, maximizing_player) #
 
+        self.tt_probes += 1
+        tt_move = None
+        tt_outcome = TT_MISS
         if tt_key in self.transposition_table: #
-            stored_score, stored_depth, stored_type = self.transposition_table[tt_key] #
+            self.tt_hits += 1
+            tt_outcome = TT_HIT
+            stored_score, stored_depth, stored_type, tt_move = self.transposition_table[tt_key] #
+            if sym and tt_move is not None:
+                tt_move = board.from_canonical(sym, tt_move)
 
             if stored_depth >= depth:
                 if stored_type == EXACT: #
+                    if tracer is not None:
+                        tracer.record(self._root_depth - depth, depth, tt_move, entry_alpha, entry_beta, 0, -1, TT_CUTOFF)
                     return stored_score
                 elif stored_type == LOWER_BOUND and stored_score > alpha: #
                     alpha = stored_score
@@ -141,24 +547,27 @@ class MinimaxAI:
                     beta = stored_score
 
                 if alpha >= beta: #
+                    if tracer is not None:
+                        tracer.record(self._root_depth - depth, depth, tt_move, entry_alpha, entry_beta, 0, -1, TT_CUTOFF)
                     return stored_score
 
         # Terminal conditions (win, loss, draw, max depth)
         if board.has_winner(ai_symbol): #
+            self.leaves += 1
             return 1000000000 + depth
         if board.has_winner(human_symbol): #
+            self.leaves += 1
             return -1000000000 - depth
         if board.is_full(): #
+            self.leaves += 1
             return 0
         if depth == 0:
+            self.leaves += 1
             return self._evaluate_board(board, ai_symbol, human_symbol) #
 
-        # Determine search radius for deeper minimax calls
-        # Tăng search_radius cho các cấp độ sâu hơn của minimax trong chế độ hard
-        search_radius_for_minimax = 3 if self.difficulty == "hard" else 1 
-        legal_moves_for_eval = self._get_relevant_moves(board, search_radius=search_radius_for_minimax) #
+        legal_moves_for_eval = self._get_relevant_moves(board, search_radius=self.inner_radius) #
         if not legal_moves_for_eval:
-            legal_moves_for_eval = list(board._legal)
+            legal_moves_for_eval = list(board.legal)
             if not legal_moves_for_eval:
                 return self._evaluate_board(board, ai_symbol, human_symbol) #
 
@@ -172,56 +581,166 @@ class MinimaxAI:
                 key=lambda move: self._evaluate_move_potential(board, move, human_symbol, ai_symbol), reverse=True
             )
 
-        best_score_at_node = -math.inf if maximizing_player else math.inf
-        node_type = EXACT
+        # The best move from an earlier visit of this position goes first
+        if tt_move is not None and tt_move in legal_moves_for_eval:
+            legal_moves_for_eval.remove(tt_move)
+            legal_moves_for_eval.insert(0, tt_move)
 
-        for move in legal_moves_for_eval:
-            if time.time() - self.start_time > self.search_time_limit:
-                return self._evaluate_board(board, ai_symbol, human_symbol) #
+        best_score_at_node = -math.inf if maximizing_player else math.inf
+        best_move_at_node = None
+        cutoff_index = -1
+        loop_alpha, loop_beta = alpha, beta
+        use_pvs = self.pvs
 
+        for index, move in enumerate(legal_moves_for_eval):
             board.place(move[0], move[1], ai_symbol if maximizing_player else human_symbol) #
-
-            eval_score = self._minimax(board, depth - 1, alpha, beta, not maximizing_player, ai_symbol, human_symbol) #
-
-            board.undo_place(move[0], move[1]) #
+            try:
+                if use_pvs and index > 0:
+                    eval_score = self._pvs_child(board, depth, index, alpha, beta, maximizing_player, ai_symbol, human_symbol)
+                else:
+                    eval_score = self._minimax(board, depth - 1, alpha, beta, not maximizing_player, ai_symbol, human_symbol) #
+            finally:
+                board.undo_place(move[0], move[1]) #
 
             if maximizing_player:
-                best_score_at_node = max(best_score_at_node, eval_score)
+                if eval_score > best_score_at_node:
+                    best_score_at_node, best_move_at_node = eval_score, move
                 alpha = max(alpha, eval_score)
                 if beta <= alpha:
-                    node_type = LOWER_BOUND #
+                    self.cutoffs += 1
+                    cutoff_index = index
                     break
             else:  # minimizing_player
-                best_score_at_node = min(best_score_at_node, eval_score)
+                if eval_score < best_score_at_node:
+                    best_score_at_node, best_move_at_node = eval_score, move
                 beta = min(beta, eval_score)
                 if beta <= alpha:
-                    node_type = UPPER_BOUND #
+                    self.cutoffs += 1
+                    cutoff_index = index
                     break
 
+        # The stored score is only exact if it fell strictly inside the window searched
+        if best_score_at_node >= loop_beta:
+            node_type = LOWER_BOUND #
+        elif best_score_at_node <= loop_alpha:
+            node_type = UPPER_BOUND #
+        else:
+            node_type = EXACT
+
+        if tracer is not None:
+            children = cutoff_index + 1 if cutoff_index >= 0 else len(legal_moves_for_eval)
+            tracer.record(self._root_depth - depth, depth, best_move_at_node, entry_alpha, entry_beta,
+                          children, cutoff_index, tt_outcome)
+
         # Store result in transposition table
-        self.transposition_table[tt_key] = (best_score_at_node, depth, node_type) #
+        if sym and best_move_at_node is not None:
+            best_move_at_node = board.to_canonical(sym, best_move_at_node)
+        self.transposition_table[tt_key] = (best_score_at_node, depth, node_type, best_move_at_node) #
         return best_score_at_node
 
+    def _pvs_child(self, board: Board, depth: int, index: int, alpha: float, beta: float,
+                   maximizing_player: bool, ai_symbol: str, human_symbol: str) -> float:
+        """Search a non-first child: reduced and/or null window first, full re-search only if it may be better."""
+        child = not maximizing_player
+        reduced = depth >= LMR_MIN_DEPTH and index >= LMR_MIN_INDEX
+        if maximizing_player:
+            score = self._minimax(board, depth - 2 if reduced else depth - 1, alpha, alpha + 1, child, ai_symbol, human_symbol)
+            if reduced and score > alpha:
+                score = self._minimax(board, depth - 1, alpha, alpha + 1, child, ai_symbol, human_symbol)
+            if alpha < score < beta:
+                score = self._minimax(board, depth - 1, alpha, beta, child, ai_symbol, human_symbol)
+        else:
+            score = self._minimax(board, depth - 2 if reduced else depth - 1, beta - 1, beta, child, ai_symbol, human_symbol)
+            if reduced and score < beta:
+                score = self._minimax(board, depth - 1, beta - 1, beta, child, ai_symbol, human_symbol)
+            if alpha < score < beta:
+                score = self._minimax(board, depth - 1, alpha, beta, child, ai_symbol, human_symbol)
+        return score
+
+    def _search_root_pvs(self, board: Board, moves: List[Tuple[int, int]], depth: int,
+                         previous_score: Optional[float], ai_symbol: str, human_symbol: str,
+                         root_scores: Dict[Tuple[int, int], float]) -> Tuple[Tuple[int, int], float]:
+        """Root search with an aspiration window around the previous iteration's score."""
+        alpha, beta = -math.inf, math.inf
+        if previous_score is not None and abs(previous_score) < WIN_SCORE:
+            delta = max(ASPIRATION_MIN_WINDOW, abs(previous_score) * ASPIRATION_FRACTION)
+            alpha, beta = previous_score - delta, previous_score + delta
+        while True:
+            root_scores.clear()
+            move, score = self._root_pass_pvs(board, moves, depth, alpha, beta, ai_symbol, human_symbol, root_scores)
+            if score <= alpha and alpha > -math.inf:
+                alpha = -math.inf  # failed low: the true score is below the window
+            elif score >= beta and beta < math.inf:
+                beta = math.inf    # failed high
+            else:
+                return move, score
+
+    def _root_pass_pvs(self, board: Board, moves: List[Tuple[int, int]], depth: int, alpha: float, beta: float,
+                       ai_symbol: str, human_symbol: str,
+                       root_scores: Dict[Tuple[int, int], float]) -> Tuple[Tuple[int, int], float]:
+        best_move, best_score = moves[0], -math.inf
+        for index, move in enumerate(moves):
+            self._check_limits()
+            board.place(move[0], move[1], ai_symbol) #
+            try:
+                if index == 0:
+                    score = self._minimax(board, depth - 1, alpha, beta, False, ai_symbol, human_symbol)
+                else:
+                    score = self._minimax(board, depth - 1, alpha, alpha + 1, False, ai_symbol, human_symbol)
+                    if alpha < score < beta:
+                        score = self._minimax(board, depth - 1, alpha, beta, False, ai_symbol, human_symbol)
+            finally:
+                board.undo_place(move[0], move[1]) #
+            root_scores[move] = score
+            if score > best_score:
+                best_move, best_score = move, score
+                self._root_best = (move, score)
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                break
+        return best_move, best_score
+
     def _evaluate_board(self, board: Board, ai_symbol: str, human_symbol: str) -> float:
+        """Static evaluation, cached by canonical position hash (boards of one geometry share keys)."""
+        key = (board.canonical()[0], ai_symbol)
+        score = self.eval_cache.get(key)
+        if score is None:
+            score = self._evaluate_board_uncached(board, ai_symbol, human_symbol)
+            self.eval_cache[key] = score
+        return score
+
+    def _evaluate_board_uncached(self, board: Board, ai_symbol: str, human_symbol: str) -> float:
         """
         Improved evaluation function, heavily prioritizing immediate threats and blocks.
         """
         score = 0
+        params = self.params
 
         # Weights for different lengths of lines
         weights = {}
         for i in range(1, board._win_len):  # Corrected: board.win_len -> board._win_len
-            weights[i] = 10 ** (i * 2)
+            weights[i] = params.line_base ** i
 
         # Special, very high weights for immediate win threats (N-1) and strong threats (N-2)
-        threat_score_n_minus_1 = 100_000_000 #
-        threat_score_n_minus_2 = 10_000_000 #
+        threat_score_n_minus_1 = params.threat_n_minus_1 #
+        threat_score_n_minus_2 = params.threat_n_minus_2 #
+        defence = params.defence_factor
 
         directions = [(1, 0), (0, 1), (1, 1), (1, -1)] #
 
-        for r in range(board.rows): #
-            for c in range(board.cols): #
-                if board._grid[r][c] == Board.OBSTACLE: #
+        # Lines without a stone score nothing, so only lines starting near the stones are scanned
+        region = board.eval_region()
+        if region is None:
+            return score
+        r0, c0, r1, c1 = region
+        r_lo, r_hi, c_lo, c_hi = board.limits  # cells outside read as obstacles
+        get = board.occupied.get  # stones and obstacles only; anything else is empty
+        empty = Board.EMPTY
+        win_len = board.win_len
+
+        for r in range(r0, r1 + 1): #
+            for c in range(c0, c1 + 1): #
+                if get((r, c)) == Board.OBSTACLE: #
                     continue
 
                 for dr, dc in directions: #
@@ -230,15 +749,14 @@ class MinimaxAI:
                     human_count = 0
                     empty_count = 0
 
-                    for k in range(board._win_len):  # Corrected: board.win_len -> board._win_len
+                    for k in range(win_len):
                         nr, nc = r + k * dr, c + k * dc
 
-                        if not (0 <= nr < board.rows and 0 <= nc < board.cols):
+                        if not (r_lo <= nr <= r_hi and c_lo <= nc <= c_hi):
                             ai_count = -math.inf
                             break
 
-                        cell_val = board._grid[nr][nc] #
-
+                        cell_val = get((nr, nc), empty) #
                         if cell_val == ai_symbol: #
                             ai_count += 1
                         elif cell_val == human_symbol: #
@@ -264,15 +782,14 @@ class MinimaxAI:
                     human_count = 0
                     empty_count = 0
 
-                    for k in range(board._win_len):  # Corrected: board.win_len -> board._win_len
+                    for k in range(win_len):
                         nr, nc = r + k * dr, c + k * dc
 
-                        if not (0 <= nr < board.rows and 0 <= nc < board.cols):
+                        if not (r_lo <= nr <= r_hi and c_lo <= nc <= c_hi):
                             human_count = -math.inf
                             break
 
-                        cell_val = board._grid[nr][nc] #
-
+                        cell_val = get((nr, nc), empty) #
                         if cell_val == human_symbol: #
                             human_count += 1
                         elif cell_val == ai_symbol: #
@@ -287,11 +804,11 @@ class MinimaxAI:
                     if ai_count == 0 and human_count > 0: #
                         if human_count + empty_count >= board._win_len:  # Corrected: board.win_len -> board._win_len
                             if human_count == board._win_len - 1 and empty_count >= 1:  # Corrected: board.win_len -> board._win_len
-                                score -= threat_score_n_minus_1 * 1.5 #
+                                score -= threat_score_n_minus_1 * defence #
                             elif human_count == board._win_len - 2 and empty_count >= 2:  # Corrected: board.win_len -> board._win_len
-                                score -= threat_score_n_minus_2 * 1.5 #
+                                score -= threat_score_n_minus_2 * defence #
                             else:
-                                score -= weights.get(human_count, 0) * 1.5 #
+                                score -= weights.get(human_count, 0) * defence #
 
         return score
 
@@ -315,22 +832,19 @@ class MinimaxAI:
         directions_adj = [(1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1)] #
         for dr, dc in directions_adj: #
             nr, nc = r + dr, c + dc
-            if (
-                0 <= nr < board.rows
-                and 0 <= nc < board.cols
-                and (board._grid[nr][nc] != Board.EMPTY and board._grid[nr][nc] != Board.OBSTACLE)
-            ):
+            if board.cell(nr, nc) not in (Board.EMPTY, Board.OBSTACLE):
                 adj_bonus += 1
 
-        score += adj_bonus * 5 #
+        score += adj_bonus * self.params.adjacency_bonus #
 
-        # Bonus for moves near the center, especially on large boards
-        center_row = board.rows // 2 #
-        center_col = board.cols // 2 #
+        # Bonus for moves near the center, especially on large boards (an unbounded board has none)
+        if not board.bounded:
+            return score
+        center_row, center_col = board.center #
         dist_from_center = abs(r - center_row) + abs(c - center_col) #
         max_dist = (board.rows // 2) + (board.cols // 2) #
         if max_dist > 0:
-            center_bonus = (max_dist - dist_from_center) / max_dist * 50 #
+            center_bonus = (max_dist - dist_from_center) / max_dist * self.params.center_bonus #
             score += center_bonus
 
         return score
@@ -341,123 +855,33 @@ class MinimaxAI:
         within a given search_radius. Handles empty board as well.
         """
         relevant_moves = set()
-
-        occupied_cells = sum(
-            1
-            for r in range(board.rows)
-            for c in range(board.cols)
-            if board._grid[r][c] != Board.EMPTY and board._grid[r][c] != Board.OBSTACLE
-        )
-
-        total_playable_cells = board.rows * board.cols - board._num_obstacles
-
-        if total_playable_cells > 0 and occupied_cells / total_playable_cells < 0.1:
-            center_row = board.rows // 2
-            center_col = board.cols // 2
-            initial_search_radius = max(2, min(board.rows, board.cols) // 4)
-            for r_offset in range(-initial_search_radius, initial_search_radius + 1):
-                for c_offset in range(-initial_search_radius, initial_search_radius + 1):
-                    nr, nc = center_row + r_offset, center_col + c_offset
-                    if 0 <= nr < board.rows and 0 <= nc < board.cols and board.is_empty(nr, nc):
+        stones = board.stones()
+
+        if board.bounded:
+            total_playable_cells = board.rows * board.cols - board.num_obstacles
+
+            if total_playable_cells > 0 and len(stones) / total_playable_cells < 0.1:
+                center_row, center_col = board.center
+                initial_search_radius = max(2, min(board.rows, board.cols) // 4)
+                for r_offset in range(-initial_search_radius, initial_search_radius + 1):
+                    for c_offset in range(-initial_search_radius, initial_search_radius + 1):
+                        nr, nc = center_row + r_offset, center_col + c_offset
+                        if board.is_empty(nr, nc):
+                            relevant_moves.add((nr, nc))
+
+                if relevant_moves:
+                    return sorted(list(relevant_moves))
+                else:
+                    return sorted(list(board.legal))
+
+        for r, c, _ in stones:
+            for row_offset in range(-search_radius, search_radius + 1):
+                for col_offset in range(-search_radius, search_radius + 1):  # Corrected loop
+                    nr, nc = r + row_offset, c + col_offset
+                    if board.is_empty(nr, nc):
                         relevant_moves.add((nr, nc))
 
-            if relevant_moves:
-                return sorted(list(relevant_moves))
-            else:
-                return sorted(list(board._legal)) if board._legal else []
-
-        for r in range(board.rows):
-            for c in range(board.cols):
-                cell_val = board._grid[r][c]
-                if cell_val != Board.EMPTY and cell_val != Board.OBSTACLE:
-                    for row_offset in range(-search_radius, search_radius + 1):
-                        for col_offset in range(-search_radius, search_radius + 1):  # Corrected loop
-                            nr, nc = r + row_offset, c + col_offset
-                            if 0 <= nr < board.rows and 0 <= nc < board.cols and board.is_empty(nr, nc):
-                                relevant_moves.add((nr, nc))
-
         if not relevant_moves:
-            return sorted(list(board._legal)) if board._legal else []
+            return sorted(list(board.legal))
 
         return sorted(list(relevant_moves))
-
-    # Q-learning related methods (keep as is for easy mode)
-    def _get_state_representation(self, board: Board) -> Tuple[str, ...]:
-        """Convert board state to hashable tuple for Q-table."""
-        return tuple(cell for row in board._grid for cell in row)
-
-    def _get_q_learning_move(self, board: Board, ai_symbol: str, human_symbol: str) -> Optional[Tuple[int, int]]:
-        state = self._get_state_representation(board)
-        legal_moves = list(board._legal)
-
-        if not legal_moves:
-            return None
-
-        # Epsilon-greedy strategy
-        if random.uniform(0, 1) < self.exploration_rate:
-            move = random.choice(legal_moves)
-        else:
-            q_values = self.q_table[state]
-
-            legal_q_values = []
-            legal_actions = []
-            for r, c in legal_moves:
-                action_idx = r * board.cols + c
-                legal_q_values.append(q_values[action_idx])
-                legal_actions.append((r, c))
-
-            if not legal_actions:
-                move = random.choice(list(board._legal))
-            else:
-                max_q_value = -math.inf
-                best_legal_moves = []
-                for i, qv in enumerate(legal_q_values):
-                    if qv > max_q_value:
-                        max_q_value = qv
-                        best_legal_moves = [legal_actions[i]]
-                    elif qv == max_q_value:
-                        best_legal_moves.append(legal_actions[i])
-                move = random.choice(best_legal_moves)
-
-        self.last_state = state
-        self.last_action = move
-        self.exploration_rate = max(self.min_exploration_rate, self.exploration_rate * self.exploration_decay)
-        return move
-
-    def update_q_table(self, old_board: Board, new_board: Board, ai_symbol: str, human_symbol: str, reward: float):
-        """Update Q-table. (Requires external call from controller for full learning)"""
-        if self.difficulty != "easy" or self.last_state is None or self.last_action is None:
-            return
-
-        old_state = self.last_state
-        action_row, action_col = self.last_action
-        action_idx = action_row * new_board.cols + action_col
-
-        new_state = self._get_state_representation(new_board)
-        current_q_value = self.q_table[old_state][action_idx]
-
-        next_legal_moves_indices = []
-        for r, c in new_board._legal:
-            next_legal_moves_indices.append(r * new_board.cols + c)
-
-        if next_legal_moves_indices:
-            max_next_q = max(self.q_table[new_state][idx] for idx in next_legal_moves_indices)
-        else:
-            max_next_q = 0.0
-
-        updated_q_value = current_q_value + self.learning_rate * (
-            reward + self.discount_factor * max_next_q - current_q_value
-        )
-        self.q_table[old_state][action_idx] = updated_q_value
-
-        self.last_state = None
-        self.last_action = None
-
-    def get_reward(self, board: Board, ai_symbol: str, human_symbol: str) -> float:
-        if board.has_winner(ai_symbol):
-            return 1.0
-        if board.has_winner(human_symbol):
-            return -1.0
-        if board.is_full():
-            return 0.5
-        return 0.0
\ No newline at end of file
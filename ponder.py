@@ -0,0 +1,128 @@
+# ponder.py
+"""Pondering: search on the opponent's time.
+
+After the AI moves, `Ponderer` assumes the opponent will play the second
+move of the principal variation and searches the resulting position in a
+background thread with the AI's own (shared) transposition table. If the
+opponent does play that move, the pondered result is reused; otherwise the
+thread is stopped and the table it warmed up still speeds up the real search.
+Background searches are not published (last_result, stats sink); a hit is
+published by take() as a `pondered` result whose elapsed time is the
+actual reply latency.
+
+Only one search runs on a MinimaxAI at a time: the controller always stops
+the ponder thread before searching on the main thread.
+
+The search is pure Python and shares the GIL with the UI, so it is
+throttled: at every clock poll the thread sleeps long enough to use at most
+`duty_cycle` of a core, and it gives up after `max_nodes` nodes.
+"""
+import dataclasses
+import threading
+import time
+from typing import Optional, Tuple
+
+from board import Board
+from minimax import MinimaxAI, SearchLimits, SearchResult
+
+PONDER_TIME_FACTOR = 10.0  # ponder for at most this many normal move budgets
+MIN_REMAINING_TIME = 0.05  # seconds left for the real search after a partial ponder hit
+PONDER_DUTY_CYCLE = 0.25   # fraction of wall time the ponder thread may hold the GIL
+PONDER_MAX_NODES = 20_000  # node cap per ponder search
+
+
+class Ponderer:
+    """Runs at most one background search for the position after the predicted reply."""
+
+    def __init__(self, duty_cycle: float = PONDER_DUTY_CYCLE, max_nodes: int = PONDER_MAX_NODES) -> None:
+        self._duty_cycle = min(max(duty_cycle, 0.01), 1.0)
+        self._max_nodes = max_nodes
+        self._ai: Optional[MinimaxAI] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._predicted: Optional[Tuple[int, int]] = None
+        self._result: Optional[SearchResult] = None
+        self._started = 0.0
+        self._busy = 0.0         # seconds actually spent searching (excludes throttle sleeps)
+        self._resumed = 0.0
+        self._finished = False
+
+    @property
+    def predicted(self) -> Optional[Tuple[int, int]]:
+        return self._predicted
+
+    @property
+    def active(self) -> bool:
+        return self._thread is not None
+
+    def start(self, ai: MinimaxAI, board: Board, ai_symbol: str, human_symbol: str) -> bool:
+        """Ponder with `ai` on the reply predicted by its last search; False when there is no prediction."""
+        self.stop()
+        last = ai.last_result
+        if last is None or len(last.pv) < 2:
+            return False
+        predicted = last.pv[1]
+        position = board.copy()  # private to the ponder thread
+        if not position.place(predicted[0], predicted[1], human_symbol) or position.has_winner(human_symbol) \
+                or not position.legal:
+            return False
+
+        self._ai = ai
+        budget = ai.search_time_limit * PONDER_TIME_FACTOR
+        limits = SearchLimits(time_limit=budget, soft_time_limit=budget * 0.5, max_nodes=self._max_nodes,
+                              should_stop=self._throttle)
+        self._predicted = predicted
+        self._result = None
+        self._finished = False
+        self._stop.clear()
+        self._started = self._resumed = time.monotonic()
+        self._busy = 0.0
+        self._thread = threading.Thread(target=self._run, args=(position, ai_symbol, human_symbol, limits),
+                                        name="ponder", daemon=True)
+        self._thread.start()
+        return True
+
+    def _throttle(self) -> bool:
+        """Stop-flag poll that also sleeps off the share of time the UI should get."""
+        now = time.monotonic()
+        active = now - self._resumed
+        self._busy += active
+        pause = active * (1.0 - self._duty_cycle) / self._duty_cycle
+        if pause > 0 and self._stop.wait(pause):  # sleeps without the GIL; wakes at once on stop()
+            return True
+        self._resumed = time.monotonic()
+        return self._stop.is_set()
+
+    def _run(self, position: Board, ai_symbol: str, human_symbol: str, limits: SearchLimits) -> None:
+        self._result = self._ai.search(position, ai_symbol, human_symbol, limits, publish=False)
+        # a search cut short by the node cap is not a substitute for the real one
+        self._finished = not self._stop.is_set() and self._result.nodes < self._max_nodes
+
+    def stop(self) -> None:
+        """Abort the background search (if any) and wait for the thread to leave the AI."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def take(self, opponent_move: Tuple[int, int]) -> Tuple[Optional[Tuple[int, int]], Optional[SearchLimits]]:
+        """Stop pondering once the opponent has moved.
+
+        Returns (move, None) when the pondered search can be played as is, or
+        (None, limits) with the time still owed to the real search; limits is
+        None when the prediction missed and the search should run normally.
+        """
+        if self._thread is None:
+            return None, None
+        start = time.monotonic()
+        self.stop()
+        pondered = self._busy  # search time, not wall time: the thread was throttled
+        result = self._result
+        if opponent_move != self._predicted or result is None or result.move is None:
+            return None, None
+        if self._finished or pondered >= self._ai.search_time_limit:
+            self._ai.publish(dataclasses.replace(result, elapsed=time.monotonic() - start, pondered=True))
+            return result.move, None
+        remaining = max(self._ai.search_time_limit - pondered, MIN_REMAINING_TIME)
+        return None, SearchLimits(time_limit=remaining)
@@ -0,0 +1,42 @@
+# positions.py
+"""Seeded board geometries and positions shared by the benchmark, arena and calibration."""
+import random
+from typing import List, Tuple
+
+from board import Board
+
+# (rows, cols, win_len, num_obstacles)
+GEOMETRIES: List[Tuple[int, int, int, int]] = [
+    (3, 3, 3, 0),
+    (5, 5, 4, 5),
+    (10, 10, 5, 10),
+    (15, 15, 5, 20),
+]
+
+
+def make_position(rows: int, cols: int, win_len: int, num_obstacles: int,
+                  stones: int, seed: int) -> Board:
+    """Build a reproducible position: seeded obstacles plus `stones` random moves without a winner."""
+    board = Board(rows=rows, cols=cols, win_len=win_len, num_obstacles=num_obstacles, seed=seed)
+    rng = random.Random(seed)
+    symbol = "X"
+    placed = 0
+    while placed < stones and board.legal:
+        candidates = sorted(board.legal)
+        rng.shuffle(candidates)
+        for r, c in candidates:
+            board.place(r, c, symbol)
+            if not board.has_winner(symbol):
+                break
+            board.undo_place(r, c)
+        else:
+            break  # every remaining move wins, stop here
+        symbol = "O" if symbol == "X" else "X"
+        placed += 1
+    return board
+
+
+def side_to_move(board: Board) -> Tuple[str, str]:
+    x = sum(row.count("X") for row in board._grid)
+    o = sum(row.count("O") for row in board._grid)
+    return ("X", "O") if x == o else ("O", "X")
@@ -0,0 +1,102 @@
+# profiling.py
+"""Opt-in profiling of AI moves, controlled by environment variables.
+
+    TTT_PROFILE=cprofile    dump a cProfile .prof file per move
+    TTT_PROFILE=sample      dump a collapsed-stack file per move (flamegraph.pl / speedscope)
+    TTT_PROFILE=both        both of the above
+    TTT_PROFILE_DIR=...     output directory (default: profiles)
+    TTT_PROFILE_INTERVAL=.. sampling interval in milliseconds (default: 1)
+
+When TTT_PROFILE is unset, `instrument()` returns the function unchanged,
+so disabled profiling costs nothing on the hot path.
+"""
+import cProfile
+import collections
+import functools
+import itertools
+import os
+import sys
+import threading
+from typing import Callable, Counter, Optional
+
+PROFILE_ENV = "TTT_PROFILE"
+PROFILE_DIR_ENV = "TTT_PROFILE_DIR"
+PROFILE_INTERVAL_ENV = "TTT_PROFILE_INTERVAL"
+
+_MODES = {"cprofile": (True, False), "sample": (False, True), "both": (True, True)}
+_counter = itertools.count(1)
+
+
+def profile_mode() -> Optional[str]:
+    mode = os.environ.get(PROFILE_ENV, "").strip().lower()
+    return mode if mode in _MODES else None
+
+
+class StackSampler:
+    """Samples one thread's Python stack from a background thread and counts collapsed stacks."""
+
+    def __init__(self, interval: float = 0.001) -> None:
+        self._interval = interval
+        self._target = threading.get_ident()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.stacks: Counter[str] = collections.Counter()
+
+    def start(self) -> None:
+        self._target = threading.get_ident()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval):
+            frame = sys._current_frames().get(self._target)
+            if frame is None:
+                continue
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            self.stacks[";".join(reversed(names))] += 1
+
+    def write_collapsed(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as fh:
+            for stack, count in self.stacks.most_common():
+                fh.write(f"{stack} {count}\n")
+
+
+def instrument(fn: Callable, label: str) -> Callable:
+    """Wrap `fn` so every call is profiled according to TTT_PROFILE; identity when disabled."""
+    mode = profile_mode()
+    if mode is None:
+        return fn
+    use_cprofile, use_sampler = _MODES[mode]
+    out_dir = os.environ.get(PROFILE_DIR_ENV, "profiles")
+    interval = float(os.environ.get(PROFILE_INTERVAL_ENV, "1")) / 1000.0
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        os.makedirs(out_dir, exist_ok=True)
+        base = os.path.join(out_dir, f"{label}-{os.getpid()}-{next(_counter):05d}")
+        profiler = cProfile.Profile() if use_cprofile else None
+        sampler = StackSampler(interval) if use_sampler else None
+        if sampler:
+            sampler.start()
+        if profiler:
+            profiler.enable()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            if profiler:
+                profiler.disable()
+                profiler.dump_stats(base + ".prof")
+            if sampler:
+                sampler.stop()
+                sampler.write_collapsed(base + ".collapsed")
+
+    return wrapper
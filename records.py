@@ -0,0 +1,364 @@
+# records.py
+"""Compact, append-only game records.
+
+A record file is a short header followed by frames; every frame is
+`type:u8 length:u16 payload`. A game is a GAME frame (geometry, obstacle
+layout, seed, mode, difficulty), one MOVE frame per move (cell, symbol,
+think time), an UNDO frame when moves are taken back, and an END frame, all tagged with a game id, so games from
+several controllers can be interleaved and a crash only loses the frame
+being written. Set TTT_RECORD to record every GameController game:
+
+    TTT_RECORD=games.rec python main.py
+    python records.py dump games.rec
+    python records.py analyze games.rec --min-think 1.0 --difficulty hard --out slow.jsonl
+"""
+import argparse
+import itertools
+import json
+import math
+import os
+import struct
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from board import Board
+from engines import create_engine
+from minimax import SearchLimits
+from sparse_board import SparseBoard
+
+if TYPE_CHECKING:  # controller imports this module
+    from controller import GameController, GameState
+
+RECORD_ENV = "TTT_RECORD"
+
+_MAGIC = b"TTTG"
+# 2: signed cell coordinates (sparse boards); 3: 64-bit hash_seed, as in board snapshots;
+# 4: 32-bit cell coordinates, as in sparse snapshots
+_VERSION = 4
+_FILE_HEADER = struct.Struct("<4sH")
+_FRAME = struct.Struct("<BH")  # frame type, payload length
+
+FRAME_GAME, FRAME_MOVE, FRAME_END, FRAME_UNDO = 1, 2, 3, 4
+# game id, rows, cols (0 x 0 = unbounded SparseBoard), win_len, hash_seed, board seed (-1 = unknown), obstacle count
+_GAME = struct.Struct("<IHHBQqH")
+_CELL = struct.Struct("<ii")
+_MOVE = struct.Struct("<IiiBf")  # game id, row, col, symbol index, think time (s)
+_END = struct.Struct("<IB")      # game id, result
+_UNDO = struct.Struct("<IH")     # game id, number of moves taken back
+
+SYMBOLS = ("X", "O")
+RESULTS = ("unfinished", "X", "O", "draw")
+
+
+@dataclass
+class RecordedMove:
+    row: int
+    col: int
+    symbol: str
+    think_time: float
+
+
+@dataclass
+class GameRecord:
+    game_id: int
+    rows: int
+    cols: int
+    win_len: int
+    hash_seed: int
+    seed: Optional[int]
+    obstacles: List[Tuple[int, int]]
+    mode: str
+    difficulty: str
+    moves: List[RecordedMove] = field(default_factory=list)
+    result: str = "unfinished"
+
+    def replay(self, upto: Optional[int] = None) -> Board:
+        """The board after the first `upto` moves (all moves by default)."""
+        if self.rows == 0 and self.cols == 0:
+            board: Board = SparseBoard(self.win_len, self.obstacles, hash_seed=self.hash_seed)
+        else:
+            board = Board(self.rows, self.cols, self.win_len, num_obstacles=0, hash_seed=self.hash_seed)
+            board.set_obstacles(self.obstacles)
+        for m in self.moves[:upto]:
+            board.place(m.row, m.col, m.symbol)
+        return board
+
+
+# -------- writing ----------------------------------------------------------
+
+def _pack_str(text: str) -> bytes:
+    data = text.encode("utf-8")[:255]
+    return bytes([len(data)]) + data
+
+
+class RecordWriter:
+    """Appends frames to a record file, flushing each one."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._fh: BinaryIO = open(path, "ab")
+        if self._fh.tell() == 0:
+            self._fh.write(_FILE_HEADER.pack(_MAGIC, _VERSION))
+        # unique enough across processes appending to the same file
+        self._ids = itertools.count(((os.getpid() & 0xFFFF) << 16) | 1)
+
+    def close(self) -> None:
+        self._fh.close()
+
+    def _frame(self, kind: int, payload: bytes) -> None:
+        self._fh.write(_FRAME.pack(kind, len(payload)) + payload)
+        self._fh.flush()
+
+    def begin_game(self, board: Board, mode: str, difficulty: str, seed: Optional[int] = None) -> int:
+        game_id = next(self._ids) & 0xFFFFFFFF
+        obstacles = board.obstacles
+        payload = (_GAME.pack(game_id, board.rows, board.cols, board.win_len, board.hash_seed,
+                              -1 if seed is None else seed, len(obstacles))
+                   + b"".join(_CELL.pack(r, c) for r, c in obstacles)
+                   + _pack_str(mode) + _pack_str(difficulty))
+        self._frame(FRAME_GAME, payload)
+        return game_id
+
+    def move(self, game_id: int, row: int, col: int, symbol: str, think_time: float) -> None:
+        self._frame(FRAME_MOVE, _MOVE.pack(game_id, row, col, SYMBOLS.index(symbol), think_time))
+
+    def undo(self, game_id: int, count: int) -> None:
+        self._frame(FRAME_UNDO, _UNDO.pack(game_id, count))
+
+    def end_game(self, game_id: int, result: str) -> None:
+        self._frame(FRAME_END, _END.pack(game_id, RESULTS.index(result)))
+
+
+_default: Optional[RecordWriter] = None
+
+
+def default_writer() -> Optional[RecordWriter]:
+    """Process-wide writer configured from TTT_RECORD."""
+    global _default
+    path = os.environ.get(RECORD_ENV)
+    if not path:
+        return None
+    if _default is None:
+        _default = RecordWriter(path)
+    return _default
+
+
+class GameRecorder:
+    """GameController observer that streams the game into a RecordWriter."""
+
+    def __init__(self, controller: "GameController", writer: RecordWriter) -> None:
+        self._controller = controller
+        self._writer = writer
+        self._game_id: Optional[int] = None
+        self._pending = False  # begin() was called; the GAME frame waits for the first move
+        self._last_move_time = 0.0
+        self._recorded: List[Tuple[int, int, str]] = []  # moves written for the current game
+        self._ended = False
+
+    def begin(self) -> None:
+        """Start a new game record from the controller's (freshly reset) board.
+
+        Nothing is written until the first move, so a game that is reset or
+        thrown away before anyone plays leaves no empty record behind.
+        """
+        self._game_id = None
+        self._pending = True
+        self._last_move_time = time.monotonic()
+        self._recorded = []
+        self._ended = False
+
+    def _ensure_game(self) -> bool:
+        """Write the GAME frame on the first move; False while no game has begun."""
+        if self._game_id is None and self._pending:
+            c = self._controller
+            board = c.getBoard()
+            self._game_id = self._writer.begin_game(board, c.mode, c.difficulty, board.layout_seed)
+            self._pending = False
+        return self._game_id is not None
+
+    def on_board_change(self, coords: Tuple[int, int], symbol: str) -> None:
+        if symbol not in SYMBOLS or not self._ensure_game():
+            return  # cells cleared by a reset
+        now = time.monotonic()
+        think = now - self._last_move_time
+        search = self._controller.last_search
+        if self._controller.is_ai_symbol(symbol) and search is not None and search.move == coords:
+            think = search.elapsed  # the engine's own time, without the UI delay
+        self._last_move_time = now
+        self._writer.move(self._game_id, coords[0], coords[1], symbol, think)
+        self._recorded.append((coords[0], coords[1], symbol))
+
+    def on_board_sync(self) -> None:
+        """Undo/redo or bulk moves: write the difference between the record and the board."""
+        moves = self._controller.getBoard().moves
+        if not moves and not self._recorded or not self._ensure_game():
+            return
+        common = 0
+        while common < min(len(moves), len(self._recorded)) and moves[common] == self._recorded[common]:
+            common += 1
+        if common < len(self._recorded):
+            self._writer.undo(self._game_id, len(self._recorded) - common)
+        for row, col, symbol in moves[common:]:
+            self._writer.move(self._game_id, row, col, symbol, 0.0)
+        self._recorded = moves
+        self._last_move_time = time.monotonic()
+
+    def on_state_change(self, state: "GameState", next_turn: Optional[str]) -> None:
+        if self._game_id is None:
+            return
+        if state.name == "IN_PROGRESS":
+            self._ended = False  # an undo can reopen a finished game
+        elif not self._ended:
+            self._writer.end_game(self._game_id, {"X_WON": "X", "O_WON": "O", "DRAW": "draw"}[state.name])
+            self._ended = True
+
+
+# -------- reading ----------------------------------------------------------
+
+def _frames(path: str) -> Iterator[Tuple[int, bytes]]:
+    with open(path, "rb") as fh:
+        data = fh.read()
+    if data[:4] != _MAGIC:
+        raise ValueError(f"{path}: not a game record file")
+    magic, version = _FILE_HEADER.unpack_from(data)
+    if version != _VERSION:
+        raise ValueError(f"{path}: unsupported record version {version}")
+    pos = _FILE_HEADER.size
+    while pos + _FRAME.size <= len(data):
+        kind, length = _FRAME.unpack_from(data, pos)
+        pos += _FRAME.size
+        if pos + length > len(data):
+            break  # torn final frame
+        yield kind, data[pos:pos + length]
+        pos += length
+
+
+def _unpack_str(payload: bytes, pos: int) -> Tuple[str, int]:
+    if pos >= len(payload) or pos + 1 + payload[pos] > len(payload):
+        raise ValueError("string runs past the end of the frame")
+    size = payload[pos]
+    return payload[pos + 1:pos + 1 + size].decode("utf-8"), pos + 1 + size
+
+
+def _parse_game(payload: bytes) -> GameRecord:
+    if len(payload) < _GAME.size:
+        raise ValueError("short GAME frame")
+    game_id, rows, cols, win_len, hash_seed, seed, n = _GAME.unpack_from(payload)
+    pos = _GAME.size
+    if pos + n * _CELL.size > len(payload):
+        raise ValueError("obstacle list runs past the end of the frame")
+    obstacles = [_CELL.unpack_from(payload, pos + i * _CELL.size) for i in range(n)]
+    pos += n * _CELL.size
+    mode, pos = _unpack_str(payload, pos)
+    difficulty, pos = _unpack_str(payload, pos)
+    return GameRecord(game_id, rows, cols, win_len, hash_seed, None if seed < 0 else seed,
+                      obstacles, mode, difficulty)
+
+
+def read_records(path: str) -> Iterator[GameRecord]:
+    """Games in the order they were started (unfinished ones included).
+
+    A torn final frame is dropped; a complete frame whose payload does not
+    match its type raises ValueError.
+    """
+    games: Dict[int, GameRecord] = {}
+    for kind, payload in _frames(path):
+        try:
+            if kind == FRAME_GAME:
+                game = _parse_game(payload)
+                games[game.game_id] = game
+            elif kind == FRAME_MOVE:
+                game_id, row, col, symbol, think = _MOVE.unpack(payload)
+                if game_id in games:
+                    games[game_id].moves.append(RecordedMove(row, col, SYMBOLS[symbol], think))
+            elif kind == FRAME_UNDO:
+                game_id, count = _UNDO.unpack(payload)
+                if game_id in games:
+                    game = games[game_id]
+                    del game.moves[len(game.moves) - count:]
+                    game.result = "unfinished"
+            elif kind == FRAME_END:
+                game_id, result = _END.unpack(payload)
+                if game_id in games:
+                    games[game_id].result = RESULTS[result]
+        except (struct.error, IndexError, UnicodeDecodeError, ValueError) as exc:
+            raise ValueError(f"{path}: corrupt frame of type {kind}: {exc}") from None
+    yield from games.values()
+
+
+# -------- batch analysis ---------------------------------------------------
+
+def analyze_game(task: Tuple[GameRecord, float, str, float]) -> List[Dict]:
+    """Re-search every move of one game that took at least `min_think` seconds. Runs in a worker process."""
+    record, min_think, difficulty, time_limit = task
+    ai = create_engine(difficulty)
+    out = []
+    for ply, m in enumerate(record.moves):
+        if m.think_time < min_think:
+            continue
+        board = record.replay(ply)
+        other = "O" if m.symbol == "X" else "X"
+        limits = SearchLimits(time_limit=time_limit) if time_limit > 0 else None
+        result = ai.search(board, m.symbol, other, limits)
+        out.append({
+            "game": record.game_id, "ply": ply, "symbol": m.symbol,
+            "geometry": [record.rows, record.cols, record.win_len, len(record.obstacles)],
+            "played": [m.row, m.col], "think_time": m.think_time,
+            "searched": list(result.move) if result.move else None,
+            "agrees": result.move == (m.row, m.col),
+            "elapsed": result.elapsed, "nodes": result.nodes, "depth": result.depth,
+            "score": result.score if math.isfinite(result.score) else None,
+        })
+    return out
+
+
+def analyze(paths: List[str], min_think: float = 0.0, difficulty: str = "hard", time_limit: float = 0.0,
+            workers: Optional[int] = None) -> List[Dict]:
+    tasks = [(record, min_think, difficulty, time_limit) for path in paths for record in read_records(path)]
+    rows: List[Dict] = []
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        for res in pool.map(analyze_game, tasks):
+            rows.extend(res)
+    return rows
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Inspect and re-analyse recorded games.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    dump = sub.add_parser("dump", help="print the games in record files")
+    dump.add_argument("paths", nargs="+")
+    an = sub.add_parser("analyze", help="re-search slow positions across a process pool")
+    an.add_argument("paths", nargs="+")
+    an.add_argument("--min-think", type=float, default=0.0, help="only positions whose move took this long (s)")
+    an.add_argument("--difficulty", default="hard")
+    an.add_argument("--time-limit", type=float, default=0.0, help="override the difficulty's time limit")
+    an.add_argument("--workers", type=int)
+    an.add_argument("--out", help="write one JSON line per analysed position")
+    args = parser.parse_args(argv)
+
+    if args.command == "dump":
+        for path in args.paths:
+            for g in read_records(path):
+                moves = " ".join(f"{m.symbol}{m.row},{m.col}({m.think_time:.2f}s)" for m in g.moves)
+                print(f"game {g.game_id:08x} {g.rows}x{g.cols}/{g.win_len} #{len(g.obstacles)} "
+                      f"{g.mode}/{g.difficulty} -> {g.result}: {moves}")
+        return 0
+
+    rows = analyze(args.paths, args.min_think, args.difficulty, args.time_limit, args.workers)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            for row in rows:
+                fh.write(json.dumps(row) + "\n")
+    agree = sum(r["agrees"] for r in rows)
+    print(f"{len(rows)} positions re-searched, {agree} agree with the recorded move")
+    for r in sorted(rows, key=lambda r: -r["think_time"])[:10]:
+        print(f"  game {r['game']:08x} ply {r['ply']:>3}: played {r['played']} in {r['think_time']:.2f}s, "
+              f"search {r['searched']} depth {r['depth']} in {r['elapsed']:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+# scheduler.py
+"""Schedulers used by GameController to run deferred work (AI moves).
+
+The controller only needs `schedule_once(callback, delay)`; the callback is
+called with the elapsed delay like a Kivy clock callback. Kivy is imported
+lazily so headless code never pays for it.
+"""
+import asyncio
+import collections
+from typing import Callable, Deque, Optional, Protocol, Tuple
+
+Callback = Callable[[float], None]
+
+
+class Scheduler(Protocol):
+    """Anything that can run a callback once after a delay."""
+
+    def schedule_once(self, callback: Callback, delay: float = 0.0) -> None: ...
+
+
+class KivyScheduler:
+    """Runs callbacks on the Kivy event loop (the UI default)."""
+
+    def __init__(self) -> None:
+        self._clock = None
+
+    def schedule_once(self, callback: Callback, delay: float = 0.0) -> None:
+        if self._clock is None:
+            from kivy.clock import Clock
+            self._clock = Clock
+        self._clock.schedule_once(callback, delay)
+
+
+class AsyncioScheduler:
+    """Runs callbacks on an asyncio event loop (for servers)."""
+
+    def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None, use_delay: bool = True) -> None:
+        self._loop = loop
+        self._use_delay = use_delay
+
+    def schedule_once(self, callback: Callback, delay: float = 0.0) -> None:
+        loop = self._loop or asyncio.get_running_loop()
+        if self._use_delay and delay > 0:
+            loop.call_later(delay, callback, delay)
+        else:
+            loop.call_soon(callback, 0.0)
+
+
+class ImmediateScheduler:
+    """Runs callbacks synchronously with no delay (tight headless loops, tests).
+
+    Callbacks scheduled from inside a running callback are queued and run
+    after it returns instead of recursing.
+    """
+
+    def __init__(self) -> None:
+        self._pending: Deque[Tuple[Callback, float]] = collections.deque()
+        self._running = False
+
+    def schedule_once(self, callback: Callback, delay: float = 0.0) -> None:
+        self._pending.append((callback, delay))
+        if self._running:
+            return
+        self._running = True
+        try:
+            while self._pending:
+                cb, _ = self._pending.popleft()
+                cb(0.0)
+        finally:
+            self._running = False
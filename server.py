@@ -0,0 +1,284 @@
+# server.py
+"""Asyncio game server hosting many GameController sessions.
+
+Clients speak JSON lines over TCP. Every request is one object with an
+"op" field; the server answers and streams board/state changes through a
+GameObserver attached to each game:
+
+    {"op": "new", "mode": "bot", "difficulty": "medium", "rows": 5, "cols": 5, "win_len": 4, "obstacles": 5}
+                                                   (optional "seed" for a reproducible layout)
+    {"op": "play", "game": 1, "row": 2, "col": 3}
+    {"op": "reset", "game": 1}
+    {"op": "undo", "game": 1}                      (also "redo"; answered with a "sync" event)
+    {"op": "moves", "game": 1, "moves": [[2, 2], [1, 1]]}
+    {"op": "close", "game": 1}
+
+AI searches run in a bounded process pool. Jobs go through a bounded
+queue; when it is full, the connection that asked for the move stops being
+read until there is room, so a saturated pool pushes back on clients
+instead of growing memory. The event loop itself never runs a search.
+"""
+import argparse
+import asyncio
+import functools
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from board import Board
+from controller import GameController, GameState
+from engines import select_engine
+
+MAX_WRITE_BUFFER = 1 << 20  # drop clients that stop reading once this much output is queued
+
+
+def search_move(snapshot: bytes, difficulty: str, ai_symbol: str, human_symbol: str) -> Optional[Tuple[int, int]]:
+    """Pool worker entry point: pick the AI move for a Board.to_bytes() snapshot."""
+    board = Board.from_bytes(snapshot)
+    return select_engine(board, difficulty).create(difficulty).get_best_move(board, ai_symbol, human_symbol)
+
+
+class _PendingAiMove:
+    """Scheduler handed to each controller: records that the AI must move instead of running it inline."""
+
+    def __init__(self) -> None:
+        self.pending = False
+
+    def schedule_once(self, callback, delay: float = 0.0) -> None:
+        self.pending = True
+
+
+def _grid_rows(board: Board) -> List[str]:
+    return ["".join(board.cell(r, c) for c in range(board.cols)) for r in range(board.rows)]
+
+
+class _StreamObserver:
+    """GameObserver that forwards changes of one game to a client connection."""
+
+    def __init__(self, conn: "Connection", game_id: int, board: Board) -> None:
+        self._conn = conn
+        self._game_id = game_id
+        self._board = board
+
+    def on_board_change(self, coords: Tuple[int, int], symbol: str) -> None:
+        self._conn.send({"event": "board", "game": self._game_id,
+                         "row": coords[0], "col": coords[1], "symbol": symbol})
+
+    def on_board_sync(self) -> None:
+        self._conn.send({"event": "sync", "game": self._game_id,
+                         "grid": _grid_rows(self._board)})
+
+    def on_state_change(self, state: GameState, next_turn: Optional[str]) -> None:
+        self._conn.send({"event": "state", "game": self._game_id,
+                         "state": state.name, "turn": next_turn})
+
+
+class Session:
+    """One hosted game."""
+
+    def __init__(self, game_id: int, controller: GameController, ai_request: _PendingAiMove) -> None:
+        self.id = game_id
+        self.controller = controller
+        self.ai_request = ai_request
+        self.generation = 0  # bumped on reset so stale AI results are dropped
+        self.thinking = False
+
+
+class Connection:
+    """A client connection; owns the games it created."""
+
+    def __init__(self, writer: asyncio.StreamWriter) -> None:
+        self._writer = writer
+        self.games: Dict[int, Session] = {}
+
+    def send(self, message: Dict) -> None:
+        if self._writer.is_closing():
+            return
+        self._writer.write((json.dumps(message, separators=(",", ":")) + "\n").encode())
+        if self._writer.transport.get_write_buffer_size() > MAX_WRITE_BUFFER:
+            self._writer.close()  # slow consumer
+
+    async def drain(self) -> None:
+        if not self._writer.is_closing():
+            await self._writer.drain()
+
+
+class GameServer:
+    """Hosts sessions and feeds AI moves through a bounded worker pool."""
+
+    def __init__(self, workers: Optional[int] = None, queue_size: Optional[int] = None) -> None:
+        self._workers = workers or os.cpu_count() or 1
+        self._queue: "asyncio.Queue[Tuple[Connection, Session, int]]" = asyncio.Queue(
+            maxsize=queue_size or self._workers * 4)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._tasks = []
+        self._ids = itertools.count(1)
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._handlers: Dict[asyncio.Task, asyncio.StreamWriter] = {}
+        self.sessions = 0
+
+    # -------- lifecycle ---------------------------------------------------
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8765) -> asyncio.AbstractServer:
+        self._pool = ProcessPoolExecutor(max_workers=self._workers)
+        self._tasks = [asyncio.create_task(self._ai_worker()) for _ in range(self._workers)]
+        self._server = await asyncio.start_server(self._handle_client, host, port)
+        return self._server
+
+    async def stop(self) -> None:
+        if self._server:
+            self._server.close()
+        for writer in self._handlers.values():
+            writer.close()  # handlers see EOF and finish on their own
+        await asyncio.gather(*self._handlers, return_exceptions=True)
+        if self._server:
+            await self._server.wait_closed()
+        for t in self._tasks:
+            t.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._pool:
+            # shutdown() joins the workers; wait for running searches off the event loop
+            pool, self._pool = self._pool, None
+            await asyncio.get_running_loop().run_in_executor(None, functools.partial(pool.shutdown, cancel_futures=True))
+
+    # -------- client handling ---------------------------------------------
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        conn = Connection(writer)
+        task = asyncio.current_task()
+        self._handlers[task] = writer
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    await self._dispatch(conn, request)
+                except (ValueError, KeyError, TypeError) as exc:
+                    conn.send({"event": "error", "message": str(exc)})
+                await conn.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.sessions -= len(conn.games)
+            conn.games.clear()
+            del self._handlers[task]
+            writer.close()
+
+    async def _dispatch(self, conn: Connection, request: Dict) -> None:
+        op = request["op"]
+        if op == "new":
+            self._new_game(conn, request)
+            return
+
+        session = conn.games.get(int(request["game"]))
+        if session is None:
+            raise KeyError(f"unknown game {request['game']}")
+
+        if op == "play":
+            if session.thinking:
+                conn.send({"event": "error", "game": session.id, "message": "AI is thinking"})
+                return
+            session.controller.play(int(request["row"]), int(request["col"]))
+        elif op in ("reset", "undo", "redo"):
+            session.generation += 1  # drop any AI move still being searched
+            session.thinking = False
+            session.ai_request.pending = False
+            if op == "reset":
+                session.controller.reset()
+            elif op == "undo":
+                session.controller.undo()
+            else:
+                session.controller.redo()
+        elif op == "moves":
+            if session.thinking:
+                conn.send({"event": "error", "game": session.id, "message": "AI is thinking"})
+                return
+            if not session.controller.apply_moves([(int(r), int(c)) for r, c in request["moves"]]):
+                conn.send({"event": "error", "game": session.id, "message": "illegal move sequence"})
+        elif op == "close":
+            del conn.games[session.id]
+            self.sessions -= 1
+            session.generation += 1
+            return
+        else:
+            raise ValueError(f"unknown op {op!r}")
+
+        await self._submit_if_pending(conn, session)
+
+    def _new_game(self, conn: Connection, request: Dict) -> None:
+        board = Board(rows=int(request.get("rows", 5)), cols=int(request.get("cols", 5)),
+                      win_len=int(request.get("win_len", 4)), num_obstacles=int(request.get("obstacles", 5)),
+                      seed=None if request.get("seed") is None else int(request["seed"]), min_open_windows=int(request.get("min_open_windows", 1)))
+        ai_request = _PendingAiMove()
+        controller = GameController(board, request.get("mode", "bot"), request.get("difficulty", "medium"),
+                                    scheduler=ai_request)
+        session = Session(next(self._ids), controller, ai_request)
+        controller.add_observer(_StreamObserver(conn, session.id, board))
+        conn.games[session.id] = session
+        self.sessions += 1
+        conn.send({"event": "created", "game": session.id, "tag": request.get("tag"),
+                   "rows": board.rows, "cols": board.cols,
+                   "grid": _grid_rows(board), "turn": controller.current})
+
+    # -------- AI moves ----------------------------------------------------
+
+    async def _submit_if_pending(self, conn: Connection, session: Session) -> None:
+        if not session.ai_request.pending:
+            return
+        session.ai_request.pending = False
+        session.thinking = True
+        await self._queue.put((conn, session, session.generation))  # blocks this client when saturated
+
+    async def _ai_worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            conn, session, generation = await self._queue.get()
+            try:
+                if generation != session.generation:
+                    continue  # reset or closed while queued
+                c = session.controller
+                ai_symbol = "O" if c.is_ai_symbol("O") else "X"
+                human_symbol = "X" if ai_symbol == "O" else "O"
+                # Snapshot now: the pool pickles arguments later, on its own thread, while this game may change
+                move = await loop.run_in_executor(self._pool, search_move, c.getBoard().to_bytes(), c.difficulty,
+                                                  ai_symbol, human_symbol)
+                if generation != session.generation:
+                    continue
+                session.thinking = False
+                if move:
+                    c.apply_ai_move(move)
+            except Exception as exc:  # keep the worker alive; report to the client
+                session.thinking = False
+                conn.send({"event": "error", "game": session.id, "message": f"AI failed: {exc}"})
+            finally:
+                self._queue.task_done()
+
+
+async def _serve(host: str, port: int, workers: Optional[int]) -> None:
+    server = GameServer(workers=workers)
+    srv = await server.start(host, port)
+    print(f"Serving on {', '.join(str(s.getsockname()) for s in srv.sockets)}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Host many Tic Tac Toe games over TCP (JSON lines).")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, help="AI worker processes (default: CPU count)")
+    args = parser.parse_args()
+    try:
+        asyncio.run(_serve(args.host, args.port, args.workers))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
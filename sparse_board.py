@@ -0,0 +1,235 @@
+# sparse_board.py
+"""Unbounded board for "infinite" gomoku.
+
+SparseBoard keeps only stones and obstacles in a dict and derives Zobrist
+keys lazily per cell, so memory and per-move cost grow with the number of
+stones instead of the board area. It is a drop-in Board for MinimaxAI and
+GameController: coordinates may be negative, `rows`/`cols` are 0
+(unbounded), the board is never full, and `legal`/`is_legal` cover the
+finite frontier of empty cells near the stones rather than every empty
+cell. The frontier is the move-generation set; `place()` still accepts any
+empty cell, so a player may start a fight far from the others.
+"""
+import struct
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from board import SNAPSHOT_HEADER, SNAPSHOT_MAGIC, SNAPSHOT_VERSION, Board, _check_hash_seed
+
+_MASK64 = (1 << 64) - 1
+_COORD_LIMIT = 1 << 31  # coordinates are int32 in snapshots, game records and search traces
+# Snapshot body after the shared header: frontier radius, obstacle count,
+# obstacles as (row, col) and moves as (row, col, symbol index)
+_SPARSE_BODY = struct.Struct("<BI")
+_SPARSE_CELL = struct.Struct("<ii")
+_SPARSE_MOVE = struct.Struct("<iiB")
+_SYMBOLS = ("X", "O")
+_SYMBOL_SALT = {Board.OBSTACLE: 0x0B5, "X": 0x58, "O": 0x4F}
+
+# Lazily filled key tables shared by every sparse board with the same hash seed
+_SPARSE_KEYS: Dict[int, Dict[Tuple[int, int, str], int]] = {}
+
+
+def _mix64(x: int) -> int:
+    """splitmix64 finalizer: a cheap, well-spread 64-bit hash."""
+    x = (x + 0x9E3779B97F4A7C15) & _MASK64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return x ^ (x >> 31)
+
+
+class SparseBoard(Board):
+    """Board without edges that stores only occupied cells."""
+
+    bounded = False
+
+    def __init__(self, win_len: int = 5, obstacles: Iterable[Tuple[int, int]] = (),
+                 hash_seed: int = 0, frontier_radius: int = 2) -> None:
+        self._rows = self._cols = 0  # unbounded
+        self._win_len = win_len
+        _check_hash_seed(hash_seed)
+        self._hash_seed = hash_seed
+        self._frontier_radius = frontier_radius
+        self._keys = _SPARSE_KEYS.setdefault(hash_seed, {})
+        self._layout: List[Tuple[int, int]] = list(obstacles)
+        self.reset()
+
+    # -------- public API --------------------------------------------------
+
+    def reset(self) -> None:
+        """Clear all stones; the obstacle layout is kept."""
+        self.set_obstacles(self._layout)
+
+    def set_obstacles(self, cells: List[Tuple[int, int]]) -> None:
+        self._layout = list(cells)
+        self._clear()
+        for r, c in self._layout:
+            self._add_obstacle(r, c)
+        self._num_obstacles = len(self._occupied)
+        self._layout_seed = None
+
+    @property
+    def obstacles(self) -> List[Tuple[int, int]]:
+        return sorted(cell for cell, value in self._occupied.items() if value == Board.OBSTACLE)
+
+    @property
+    def legal(self) -> Set[Tuple[int, int]]:
+        """Empty cells within `frontier_radius` of a stone (or the cell nearest the origin on an empty board)."""
+        if not self._history:
+            return {self._first_free()}
+        return self._frontier
+
+    def is_legal(self, row: int, col: int) -> bool:
+        """Whether (row, col) is in `legal`, the cells the engines consider."""
+        if not self._history:
+            return (row, col) == self._first_free()
+        return (row, col) in self._frontier
+
+    def is_empty(self, row: int, col: int) -> bool:
+        return (row, col) not in self._occupied
+
+    def place(self, row: int, col: int, symbol: str) -> bool:
+        if (row, col) in self._occupied or not (-_COORD_LIMIT <= row < _COORD_LIMIT
+                                                and -_COORD_LIMIT <= col < _COORD_LIMIT):
+            return False
+        self._occupied[(row, col)] = symbol
+        self._current_zobrist_hash ^= self._key(row, col, symbol)
+        self._history.append((row, col, symbol))
+        self._frontier.discard((row, col))
+        for cell in self._around(row, col):
+            count = self._near.get(cell, 0)
+            self._near[cell] = count + 1
+            if not count and cell not in self._occupied:
+                self._frontier.add(cell)
+        if self._redo:
+            self._redo.clear()  # a new move forks the history
+        return True
+
+    def undo_place(self, row: int, col: int) -> None:
+        symbol = self._occupied.get((row, col))
+        if symbol is None or symbol == Board.OBSTACLE:
+            return
+        del self._occupied[(row, col)]
+        self._current_zobrist_hash ^= self._key(row, col, symbol)
+        if self._history and self._history[-1][0] == row and self._history[-1][1] == col:
+            self._history.pop()
+        else:
+            self._history.remove((row, col, symbol))
+        for cell in self._around(row, col):
+            count = self._near[cell] - 1
+            if count:
+                self._near[cell] = count
+            else:
+                del self._near[cell]
+                self._frontier.discard(cell)
+        if (row, col) in self._near:
+            self._frontier.add((row, col))
+
+    def is_full(self) -> bool:
+        return False
+
+    def cell(self, row: int, col: int) -> str:
+        return self._occupied.get((row, col), Board.EMPTY)
+
+    @property
+    def limits(self) -> Tuple[float, float, float, float]:
+        inf = float("inf")
+        return (-inf, inf, -inf, inf)
+
+    @property
+    def center(self) -> Optional[Tuple[int, int]]:
+        return None
+
+    def eval_region(self) -> Optional[Tuple[int, int, int, int]]:
+        if not self._history:
+            return None
+        reach = self._win_len - 1
+        rows = [r for r, _, _ in self._history]
+        cols = [c for _, c, _ in self._history]
+        return (min(rows) - reach, min(cols) - reach, max(rows) + reach, max(cols) + reach)
+
+    def copy(self) -> "SparseBoard":
+        clone = SparseBoard.__new__(SparseBoard)
+        clone.__dict__.update(self.__dict__)
+        clone._occupied = dict(self._occupied)
+        clone._history = list(self._history)
+        clone._redo = list(self._redo)
+        clone._layout = list(self._layout)
+        clone._near = dict(self._near)
+        clone._frontier = set(self._frontier)
+        return clone
+
+    # -------- snapshots -----------------------------------------------------
+
+    def to_bytes(self) -> bytes:
+        """Snapshot in the Board format with a 0x0 geometry and coordinate lists instead of packed cells."""
+        obstacles = self.obstacles
+        return b"".join([
+            SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, 0, 0, self._win_len, self._hash_seed,
+                                 len(self._history)),
+            _SPARSE_BODY.pack(self._frontier_radius, len(obstacles)),
+            b"".join(_SPARSE_CELL.pack(r, c) for r, c in obstacles),
+            b"".join(_SPARSE_MOVE.pack(r, c, _SYMBOLS.index(s)) for r, c, s in self._history),
+        ])
+
+    @classmethod
+    def from_snapshot(cls, data: bytes, win_len: int, hash_seed: int, n_moves: int) -> "SparseBoard":
+        """Body of a sparse snapshot; use Board.from_bytes(), which reads the header."""
+        offset = SNAPSHOT_HEADER.size
+        if len(data) < offset + _SPARSE_BODY.size:
+            raise ValueError("truncated board snapshot")
+        radius, n_obstacles = _SPARSE_BODY.unpack_from(data, offset)
+        offset += _SPARSE_BODY.size
+        if len(data) != offset + n_obstacles * _SPARSE_CELL.size + n_moves * _SPARSE_MOVE.size:
+            raise ValueError("truncated board snapshot")
+        obstacles = [_SPARSE_CELL.unpack_from(data, offset + k * _SPARSE_CELL.size) for k in range(n_obstacles)]
+        offset += n_obstacles * _SPARSE_CELL.size
+        board = cls(win_len, obstacles, hash_seed=hash_seed, frontier_radius=radius)
+        for k in range(n_moves):
+            r, c, s = _SPARSE_MOVE.unpack_from(data, offset + k * _SPARSE_MOVE.size)
+            if s >= len(_SYMBOLS) or not board.place(r, c, _SYMBOLS[s]):
+                raise ValueError("corrupt board snapshot")
+        return board
+
+    # -------- internal helpers --------------------------------------------
+
+    def _key(self, row: int, col: int, symbol: str) -> int:
+        key = self._keys.get((row, col, symbol))
+        if key is None:
+            seed = _mix64(self._hash_seed ^ (_SYMBOL_SALT[symbol] << 56))
+            key = _mix64(_mix64(seed ^ (row & _MASK64)) ^ (col & _MASK64))
+            self._keys[(row, col, symbol)] = key
+        return key
+
+    def _clear(self) -> None:
+        self._occupied: Dict[Tuple[int, int], str] = {}
+        self._history: List[Tuple[int, int, str]] = []
+        self._redo: List[Tuple[int, int, str]] = []
+        self._current_zobrist_hash = 0
+        # Stones within frontier_radius of each cell, and the empty cells among them
+        self._near: Dict[Tuple[int, int], int] = {}
+        self._frontier: Set[Tuple[int, int]] = set()
+        # an unbounded board has no symmetries to canonicalize over
+        self._sym_transforms: List[int] = []
+        self._sym_maps: Dict[int, Dict[Tuple[int, int], Tuple[int, int]]] = {}
+        self._sym_hashes: List[int] = []
+
+    def _add_obstacle(self, i: int, j: int) -> None:
+        if (i, j) not in self._occupied:
+            self._occupied[(i, j)] = Board.OBSTACLE
+            self._current_zobrist_hash ^= self._key(i, j, Board.OBSTACLE)
+
+    def _around(self, row: int, col: int) -> Iterable[Tuple[int, int]]:
+        radius = self._frontier_radius
+        for r in range(row - radius, row + radius + 1):
+            for c in range(col - radius, col + radius + 1):
+                yield (r, c)
+
+    def _first_free(self) -> Tuple[int, int]:
+        """The empty cell closest to the origin (ring by ring)."""
+        radius = 0
+        while True:
+            for r in range(-radius, radius + 1):
+                for c in range(-radius, radius + 1):
+                    if max(abs(r), abs(c)) == radius and (r, c) not in self._occupied:
+                        return (r, c)
+            radius += 1
@@ -1,18 +1,129 @@
 # themes.py
+"""Theme assets: image paths plus textures shared by every widget.
+
+Each theme's cell/X/O/obstacle/background images are decoded once, on first
+use, and the same Texture objects are handed to every cell, so a mark change
+is a texture swap with no file I/O. If `assets/<theme>/theme.atlas` exists
+(built offline with `python themes.py --build-atlas`), the textures come from
+that atlas instead of the separate images.
+
+Use get_theme(name) rather than Theme(name) to share one instance (and its
+textures) per theme.
+"""
+import argparse
+import sys
 from pathlib import Path
+from typing import Dict, List, Optional
+
+VALID_THEMES = ["wood", "fire", "water", "metal", "earth"]
+ATLAS_NAME = "theme"  # assets/<theme>/theme.atlas + theme-0.png ...
+
+# Board symbols -> image keys; "bg" is the screen background
+_SYMBOL_KEYS = {".": "cell", "X": "X", "O": "O", "#": "obstacle"}
+
+_THEMES: Dict[str, "Theme"] = {}
+
+
+def _find(base: Path, *names: str) -> Path:
+    """First of `names` that exists in `base` (file names differ in case between themes)."""
+    for name in names:
+        path = base / name
+        if path.exists():
+            return path
+    return base / names[0]
+
 
 class Theme:
     def __init__(self, name: str):
         # Đảm bảo tên theme hợp lệ để tránh lỗi đường dẫn
-        valid_themes = ["wood", "fire", "water", "metal", "earth"] # Thêm các theme mới
-        if name not in valid_themes:
+        if name not in VALID_THEMES:
             print(f"Warning: Theme '{name}' not found. Defaulting to 'wood'.")
             name = "wood" # Mặc định về theme gỗ nếu tên không hợp lệ
 
         self.name = name  # Thêm thuộc tính name để lưu tên theme
         base = Path("assets") / name
-        self.bg = str(base / "bg.png")
-        self.cell_bg = str(base / "cell.png")
-        self.x_icon = str(base / "x.png")
-        self.o_icon = str(base / "o.png")
-        self.obs_icon = str(base / "obstacle.png")
\ No newline at end of file
+        self.base = base
+        self.bg = str(_find(base, "bg.png"))
+        self.cell_bg = str(_find(base, "cell.png"))
+        self.x_icon = str(_find(base, "X.png", "x.png"))
+        self.o_icon = str(_find(base, "O.png", "o.png"))
+        self.obs_icon = str(_find(base, "obstacle.png"))
+        self._textures: Optional[Dict[str, object]] = None
+
+    @property
+    def images(self) -> Dict[str, str]:
+        """Image key -> file path, the names used inside the atlas."""
+        return {"cell": self.cell_bg, "X": self.x_icon, "O": self.o_icon,
+                "obstacle": self.obs_icon, "bg": self.bg}
+
+    @property
+    def textures(self) -> Dict[str, object]:
+        """Image key -> Texture (None for images that failed to load), decoded on first access."""
+        if self._textures is None:
+            self._textures = self._load_textures()
+        return self._textures
+
+    def texture(self, symbol: str):
+        """Shared texture for a board symbol (".", "X", "O", "#") or "bg"."""
+        return self.textures.get(_SYMBOL_KEYS.get(symbol, symbol))
+
+    def _load_textures(self) -> Dict[str, object]:
+        # Kivy is imported here so the paths stay usable without a window (tests, tools)
+        from kivy.logger import Logger
+
+        atlas_path = self.base / f"{ATLAS_NAME}.atlas"
+        if atlas_path.exists():
+            from kivy.atlas import Atlas
+            atlas = Atlas(str(atlas_path))
+            textures = {key: atlas[key] for key in self.images if key in atlas.textures}
+            if len(textures) == len(self.images):
+                return textures
+            Logger.warning(f"Theme: {atlas_path} is missing images; loading them separately")
+
+        from kivy.core.image import Image as CoreImage
+        textures = {}
+        for key, path in self.images.items():
+            try:
+                textures[key] = CoreImage(path).texture
+            except Exception as exc:  # a missing image draws blank, like an Image widget would
+                Logger.warning(f"Theme: cannot load {path}: {exc}")
+                textures[key] = None
+        return textures
+
+
+def get_theme(name: str) -> Theme:
+    """The shared Theme instance for `name` (unknown names fall back to wood)."""
+    if name not in VALID_THEMES:
+        name = "wood"
+    theme = _THEMES.get(name)
+    if theme is None:
+        theme = _THEMES[name] = Theme(name)
+    return theme
+
+
+def build_atlas(name: str, size: int = 4096, padding: int = 2) -> List[str]:
+    """Pack one theme's images into assets/<name>/theme.atlas; returns the files written."""
+    from kivy.atlas import Atlas
+    theme = Theme(name)
+    outname = str(theme.base / ATLAS_NAME)
+    _, meta = Atlas.create(outname, list(theme.images.values()), size, padding=padding)
+    return [outname + ".atlas"] + [str(theme.base / page) for page in meta]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Build per-theme texture atlases.")
+    parser.add_argument("--build-atlas", action="store_true", help="pack each theme's images into one atlas")
+    parser.add_argument("themes", nargs="*", default=VALID_THEMES)
+    parser.add_argument("--size", type=int, default=4096, help="atlas page size in pixels")
+    args = parser.parse_args(argv)
+    if not args.build_atlas:
+        parser.print_help()
+        return 1
+    for name in args.themes:
+        for path in build_atlas(name, args.size):
+            print(path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
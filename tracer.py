@@ -0,0 +1,142 @@
+# tracer.py
+"""Sampling search-tree tracer for MinimaxAI.
+
+Every `sample_every`-th finished node is packed into a fixed-size binary
+ring buffer (23 bytes per record, no per-node allocation), so the tracer
+can stay on in staging. Enable it for a whole process with
+
+    TTT_TRACE=trace.bin TTT_TRACE_SAMPLE=16 python main.py
+
+and summarize the dump offline:
+
+    python tracer.py trace.bin
+"""
+import atexit
+import multiprocessing
+import multiprocessing.util
+import os
+import struct
+import sys
+from typing import Dict, Iterator, List, Optional, Tuple
+
+TRACE_ENV = "TTT_TRACE"
+TRACE_SAMPLE_ENV = "TTT_TRACE_SAMPLE"
+
+# TT outcome codes
+TT_MISS, TT_CUTOFF, TT_HIT = 0, 1, 2  # no entry / entry ended the node / entry used for bounds or ordering
+
+# ply, remaining depth, move row, move col, alpha, beta, children searched, cutoff index (-1 = none), TT outcome
+_RECORD = struct.Struct("<BBiiffHhB")  # int32 cells: SparseBoard coordinates are unbounded
+_HEADER = struct.Struct("<4sHHQ")  # magic, version, record size, record count
+_MAGIC = b"TTTR"
+_VERSION = 2  # 2: 32-bit move coordinates
+
+
+class SearchTracer:
+    """Fixed-capacity ring buffer of sampled search nodes."""
+
+    def __init__(self, capacity: int = 1 << 16, sample_every: int = 16) -> None:
+        self.capacity = capacity
+        self.sample_every = max(1, sample_every)
+        self._buf = bytearray(capacity * _RECORD.size)
+        self._seen = 0     # nodes offered
+        self._written = 0  # records written (may exceed capacity; the oldest are overwritten)
+
+    def record(self, ply: int, depth: int, move: Optional[Tuple[int, int]], alpha: float, beta: float,
+               children: int, cutoff_index: int, tt_outcome: int) -> None:
+        self._seen += 1
+        if self._seen % self.sample_every:
+            return
+        r, c = move if move is not None else (-1, -1)
+        _RECORD.pack_into(self._buf, (self._written % self.capacity) * _RECORD.size,
+                          min(ply, 255), min(max(depth, 0), 255), r, c,
+                          alpha, beta, min(children, 0xFFFF), cutoff_index, tt_outcome)
+        self._written += 1
+
+    def records(self) -> bytes:
+        """Buffered records, oldest first."""
+        size = _RECORD.size
+        if self._written <= self.capacity:
+            return bytes(self._buf[: self._written * size])
+        split = (self._written % self.capacity) * size
+        return bytes(self._buf[split:] + self._buf[:split])
+
+    def dump(self, path: str) -> None:
+        data = self.records()
+        with open(path, "wb") as fh:
+            fh.write(_HEADER.pack(_MAGIC, _VERSION, _RECORD.size, len(data) // _RECORD.size))
+            fh.write(data)
+
+
+_default: Optional[SearchTracer] = None
+
+
+def default_tracer() -> Optional[SearchTracer]:
+    """Process-wide tracer configured from TTT_TRACE; dumped at exit."""
+    global _default
+    path = os.environ.get(TRACE_ENV)
+    if not path:
+        return None
+    if _default is None:
+        _default = SearchTracer(sample_every=int(os.environ.get(TRACE_SAMPLE_ENV, "16")))
+        # worker processes each get their own file next to the main one
+        if multiprocessing.parent_process() is None:
+            atexit.register(_default.dump, path)
+        else:  # forked workers skip atexit but run multiprocessing finalizers
+            multiprocessing.util.Finalize(None, _default.dump, args=(f"{path}.{os.getpid()}",), exitpriority=10)
+    return _default
+
+
+# -------- offline analysis -------------------------------------------------
+
+def read_trace(path: str) -> Iterator[Tuple]:
+    with open(path, "rb") as fh:
+        magic, version, size, count = _HEADER.unpack(fh.read(_HEADER.size))
+        if magic != _MAGIC or version != _VERSION or size != _RECORD.size:
+            raise ValueError(f"{path}: not a version {_VERSION} search trace")
+        data = fh.read(count * size)
+    return _RECORD.iter_unpack(data)
+
+
+def summarize(records) -> Dict[int, Dict[str, float]]:
+    """Per-ply node count, mean children searched, cutoff rate, first-move cutoff rate and TT hit rate."""
+    stats: Dict[int, List[int]] = {}
+    for ply, _depth, _r, _c, _alpha, _beta, children, cutoff, tt in records:
+        s = stats.setdefault(ply, [0, 0, 0, 0, 0, 0])
+        s[0] += 1
+        if tt == TT_CUTOFF:
+            s[5] += 1
+            continue
+        s[1] += 1
+        s[2] += children
+        if cutoff >= 0:
+            s[3] += 1
+            if cutoff == 0:
+                s[4] += 1
+    out = {}
+    for ply, (nodes, expanded, children, cutoffs, first, tt_cut) in sorted(stats.items()):
+        out[ply] = {
+            "nodes": nodes,
+            "branching": children / expanded if expanded else 0.0,
+            "cutoff_rate": cutoffs / expanded if expanded else 0.0,
+            "first_move_cutoff_rate": first / cutoffs if cutoffs else 0.0,
+            "tt_cutoff_rate": tt_cut / nodes if nodes else 0.0,
+        }
+    return out
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 1:
+        print("usage: python tracer.py TRACE_FILE", file=sys.stderr)
+        return 2
+    table = summarize(read_trace(argv[0]))
+    print(f"{'ply':>3} {'nodes':>8} {'branch':>7} {'cut%':>6} {'first%':>7} {'ttcut%':>7}")
+    for ply, s in table.items():
+        print(f"{ply:>3} {s['nodes']:>8} {s['branching']:>7.2f} {s['cutoff_rate']:>6.1%} "
+              f"{s['first_move_cutoff_rate']:>7.1%} {s['tt_cutoff_rate']:>7.1%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
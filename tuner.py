@@ -0,0 +1,122 @@
+# tuner.py
+"""SPSA self-play tuner for the evaluation parameters.
+
+Each iteration perturbs every EvalParams field at once (in log space, by a
+random +/- step), plays the two perturbed settings against each other over
+seeded boards in a process pool (arena.play_game, colours swapped per seed)
+and moves the parameters towards the side that scored better. The current
+parameters are written after every iteration; MinimaxAI picks them up at
+startup from eval_params.json or $TTT_EVAL_PARAMS:
+
+    python tuner.py --iterations 100 --pairs 8 --rows 7 --cols 7 --win-len 4 --out eval_params.json
+"""
+import argparse
+import math
+import os
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, fields
+from typing import Dict, List, Optional, Tuple
+
+from arena import play_game
+from minimax import WIN_SCORE, EvalParams
+
+# log-space bounds per parameter; threats stay well below a real win
+BOUNDS: Dict[str, Tuple[float, float]] = {
+    "line_base": (math.log(2.0), math.log(1_000.0)),
+    "threat_n_minus_1": (math.log(1_000.0), math.log(WIN_SCORE / 4)),
+    "threat_n_minus_2": (math.log(100.0), math.log(WIN_SCORE / 4)),
+    "defence_factor": (math.log(0.5), math.log(4.0)),
+    "adjacency_bonus": (math.log(0.1), math.log(1_000.0)),
+    "center_bonus": (math.log(0.1), math.log(10_000.0)),
+}
+
+# SPSA gain schedules: a_k = A_GAIN / (k + 1 + STABILITY) ** ALPHA, c_k = C_GAIN / (k + 1) ** GAMMA
+A_GAIN, C_GAIN, ALPHA, GAMMA = 0.1, 0.2, 0.602, 0.101
+
+
+def _to_theta(params: EvalParams) -> List[float]:
+    return [math.log(getattr(params, f.name)) for f in fields(EvalParams)]
+
+
+def _from_theta(theta: List[float]) -> EvalParams:
+    values = {}
+    for f, x in zip(fields(EvalParams), theta):
+        low, high = BOUNDS[f.name]
+        values[f.name] = math.exp(min(max(x, low), high))
+    return EvalParams(**values)
+
+
+def _match(pool: ProcessPoolExecutor, plus: EvalParams, minus: EvalParams, difficulty: str,
+           geometry: Tuple[int, int, int, int], pairs: int, seed: int, opening: int, time_scale: float) -> float:
+    """Score of `plus` against `minus` over `pairs` seeds, each played with both colours."""
+    specs = []
+    for i in range(2 * pairs):
+        plus_is_x = i % 2 == 0
+        specs.append({
+            "game": i, "seed": seed + i // 2, "geometry": geometry, "opening": opening,
+            "x": difficulty, "o": difficulty, "a_is_x": plus_is_x, "time_scale": time_scale,
+            "x_params": asdict(plus if plus_is_x else minus),
+            "o_params": asdict(minus if plus_is_x else plus),
+        })
+    points = 0.0
+    for game in pool.map(play_game, specs):
+        plus_symbol = "X" if game["a_is_x"] else "O"
+        points += 0.5 if game["winner"] is None else float(game["winner"] == plus_symbol)
+    return points / len(specs)
+
+
+def tune(start: EvalParams, iterations: int, difficulty: str, geometry: Tuple[int, int, int, int],
+         pairs: int = 4, opening: int = 2, time_scale: float = 0.2, seed: int = 1,
+         workers: Optional[int] = None, out: Optional[str] = None, verbose: bool = True) -> EvalParams:
+    theta = _to_theta(_from_theta(_to_theta(start)))  # clamp the starting point into BOUNDS
+    stability = max(1.0, iterations * 0.1)
+    rng = random.Random(seed)
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        for k in range(iterations):
+            a_k = A_GAIN / (k + 1 + stability) ** ALPHA
+            c_k = C_GAIN / (k + 1) ** GAMMA
+            delta = [rng.choice((-1.0, 1.0)) for _ in theta]
+            plus = _from_theta([x + c_k * d for x, d in zip(theta, delta)])
+            minus = _from_theta([x - c_k * d for x, d in zip(theta, delta)])
+            # fresh boards every iteration so the tuner doesn't overfit a few openings
+            score = _match(pool, plus, minus, difficulty, geometry, pairs, seed + k * pairs, opening, time_scale)
+            diff = 2.0 * score - 1.0  # f(plus) - f(minus) with f = match score
+            theta = [x + a_k * diff / (2.0 * c_k * d) for x, d in zip(theta, delta)]
+            theta = _to_theta(_from_theta(theta))
+            current = _from_theta(theta)
+            if out:
+                current.save(out)
+            if verbose:
+                shown = " ".join(f"{name}={value:.4g}" for name, value in asdict(current).items())
+                print(f"iter {k + 1:>4}/{iterations} plus scored {score:.3f}  {shown}")
+    return _from_theta(theta)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Tune evaluation parameters by SPSA self-play.")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--pairs", type=int, default=4, help="seeds per iteration, each played with both colours")
+    parser.add_argument("--difficulty", default="medium", choices=("medium", "hard"))
+    parser.add_argument("--rows", type=int, default=5)
+    parser.add_argument("--cols", type=int, default=5)
+    parser.add_argument("--win-len", type=int, default=4)
+    parser.add_argument("--obstacles", type=int, default=5)
+    parser.add_argument("--opening", type=int, default=2, help="random stones played before the engines take over")
+    parser.add_argument("--time-scale", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--start", help="parameter file to start from (default: built-in values)")
+    parser.add_argument("--out", default="eval_params.json", help="parameter file written after every iteration")
+    args = parser.parse_args(argv)
+
+    start = EvalParams.load(args.start) if args.start else EvalParams()
+    tune(start, args.iterations, args.difficulty, (args.rows, args.cols, args.win_len, args.obstacles),
+         pairs=args.pairs, opening=args.opening, time_scale=args.time_scale, seed=args.seed,
+         workers=args.workers, out=args.out)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
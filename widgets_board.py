@@ -1,10 +1,17 @@
 # widgets_board.py
+import math
+import os
+
 from kivy.uix.gridlayout import GridLayout
 from kivy.uix.image import Image
+from kivy.uix.widget import Widget
+from kivy.uix.stencilview import StencilView
+from kivy.clock import Clock
 from kivy.uix.behaviors import ButtonBehavior
 from kivy.core.window import Window
+from kivy.graphics import Color, Rectangle
 from kivy.properties import StringProperty
-from typing import Callable, Tuple # Thêm Tuple
+from typing import Callable, Dict, List, Optional, Tuple # Thêm Tuple
 from themes import Theme # Import Theme
 
 # CELL_SIZE bây giờ là một giá trị danh nghĩa. Kích thước thực tế sẽ được xác định bởi layout.py
@@ -21,8 +28,9 @@ class XOCell(ButtonBehavior, Image):
         self._on_press_cb = on_press_cb
         self._theme = theme # Lưu đối tượng theme
 
-        # Sử dụng theme để đặt nguồn ảnh
-        self.source = self._theme.cell_bg # Ô trống
+        # Texture dùng chung của theme: đổi dấu chỉ là đổi texture, không đọc file
+        self.texture = self._theme.texture(".") # Ô trống
+        self.mark = "."
         self.allow_stretch = True
         self.keep_ratio = False
         self.size_hint = (None, None)
@@ -32,14 +40,11 @@ class XOCell(ButtonBehavior, Image):
         self._on_press_cb(self.row, self.col)
 
     def set_mark(self, symbol: str): # Đổi kiểu dữ liệu của symbol thành str
-        if symbol == "X":
-            self.source = self._theme.x_icon
-        elif symbol == "O":
-            self.source = self._theme.o_icon
-        elif symbol == "#": # Xử lý chướng ngại vật
-            self.source = self._theme.obs_icon
-        else:
-            self.source = self._theme.cell_bg
+        if symbol == self.mark:
+            return
+        self.mark = symbol
+        # "X", "O", "#" (chướng ngại vật) hoặc ô trống
+        self.texture = self._theme.texture(symbol)
 
 
 class BoardWidget(GridLayout):
@@ -75,6 +80,11 @@ class BoardWidget(GridLayout):
         Window.minimum_height = CELL_SIZE * board.rows
 
     # ------------------- public API dùng trong layout ---------------------
+    def set_cell_size(self, cell_size: float) -> None:
+        self.size = (self.cols * cell_size, self.rows * cell_size)
+        for cell in self.children:
+            cell.size = (cell_size, cell_size)
+
     def reset(self, board):
         # Duyệt qua tất cả các ô trong _cells
         for (i, j), cell in self._cells.items(): 
@@ -88,4 +98,303 @@ class BoardWidget(GridLayout):
                 pass 
 
     def update_cell(self, coords: Tuple[int, int], symbol: str): # Đổi kiểu dữ liệu của coords thành Tuple[int, int] và symbol thành str
-        self._cells[coords].set_mark(symbol)
\ No newline at end of file
+        self._cells[coords].set_mark(symbol)
+
+
+# -------- single-canvas renderer --------------------------------------------
+
+# Boards with at least this many cells get CanvasBoardWidget, from VIEWPORT_MIN_CELLS
+# (and unbounded boards) ViewportBoardWidget; $TTT_BOARD_WIDGET ("grid",
+# "canvas" or "viewport") forces one of them.
+CANVAS_MIN_CELLS = 100
+VIEWPORT_MIN_CELLS = 400
+BOARD_WIDGET_ENV = "TTT_BOARD_WIDGET"
+
+
+class CanvasBoardWidget(Widget):
+    """Same API as BoardWidget, but one Rectangle per cell on a single canvas instead of one widget per cell.
+
+    Marks only swap the (theme-shared) texture of their Rectangle, and touches map to
+    (row, col) by arithmetic, so creation, relayout and input stay cheap on
+    large boards.
+    """
+
+    def __init__(self, board, on_cell_cb: Callable[[int, int], None], theme: Theme, **kwargs):
+        super().__init__(**kwargs)
+        self.rows = board.rows
+        self.cols = board.cols
+        self._on_cell_cb = on_cell_cb
+        self._theme = theme
+        self._cell_size = float(CELL_SIZE)
+
+        self.size_hint = (None, None)
+        self.size = (CELL_SIZE * board.cols, CELL_SIZE * board.rows)
+
+        self._marks: List[str] = [board.cell(i, j) for i in range(self.rows) for j in range(self.cols)]
+        self._rects: List[Rectangle] = []
+        with self.canvas:
+            Color(1, 1, 1, 1)
+            for mark in self._marks:
+                self._rects.append(Rectangle(texture=theme.texture(mark)))
+        self._relayout()
+        self.bind(pos=self._relayout, size=self._relayout)
+
+        Window.minimum_width  = CELL_SIZE * board.cols
+        Window.minimum_height = CELL_SIZE * board.rows
+
+    # ------------------- public API dùng trong layout ---------------------
+    def set_cell_size(self, cell_size: float) -> None:
+        self._cell_size = cell_size
+        self.size = (self.cols * cell_size, self.rows * cell_size)  # triggers _relayout
+
+    def reset(self, board):
+        for i in range(self.rows):
+            for j in range(self.cols):
+                self.update_cell((i, j), board.cell(i, j))
+
+    def update_cell(self, coords: Tuple[int, int], symbol: str):
+        index = coords[0] * self.cols + coords[1]
+        if self._marks[index] != symbol:
+            self._marks[index] = symbol
+            self._rects[index].texture = self._theme.texture(symbol)
+
+    # ------------------- touches ------------------------------------------
+    def cell_at(self, x: float, y: float) -> Optional[Tuple[int, int]]:
+        """(row, col) under a window point, row 0 at the top like the GridLayout version."""
+        if not self.collide_point(x, y) or self._cell_size <= 0:
+            return None
+        row = int((self.top - y) // self._cell_size)
+        col = int((x - self.x) // self._cell_size)
+        if 0 <= row < self.rows and 0 <= col < self.cols:
+            return row, col
+        return None
+
+    def on_touch_down(self, touch):
+        cell = self.cell_at(*touch.pos)
+        if cell is None:
+            return super().on_touch_down(touch)
+        touch.ud[self] = cell
+        return True
+
+    def on_touch_up(self, touch):
+        pressed = touch.ud.get(self)
+        if pressed is None:
+            return super().on_touch_up(touch)
+        if self.cell_at(*touch.pos) == pressed:  # like a button: release on the cell that was pressed
+            self._on_cell_cb(*pressed)
+        return True
+
+    # ------------------- helpers ------------------------------------------
+    def _relayout(self, *_):
+        size = self._cell_size
+        left, top = self.x, self.top
+        cols = self.cols
+        for index, rect in enumerate(self._rects):
+            row, col = divmod(index, cols)
+            rect.pos = (left + col * size, top - (row + 1) * size)
+            rect.size = (size, size)
+
+
+# -------- pan/zoom viewport ---------------------------------------------------
+
+MIN_VIEW_CELL = 16.0      # px; zoom-out limit (bounds the number of Rectangles drawn)
+MAX_VIEW_CELL = 160.0     # px; zoom-in limit
+DEFAULT_VIEW_CELL = 40.0  # px; initial zoom of an unbounded board
+ZOOM_STEP = 1.15          # per mouse-wheel notch
+TAP_SLOP = 10.0           # px a touch may move and still count as a tap
+
+
+class ViewportBoardWidget(StencilView):
+    """Pannable, zoomable view onto a board of any size (SparseBoard included).
+
+    The widget fills the area the layout gives it. Only cells intersecting
+    the visible rect get a Rectangle (from a reused pool), and the view is
+    rebuilt at most once per frame through a Clock trigger, however many
+    pan, zoom, resize or move events arrive. Drag pans, the mouse wheel or a
+    pinch zooms, and a tap plays the cell under it.
+    """
+
+    def __init__(self, board, on_cell_cb: Callable[[int, int], None], theme: Theme, **kwargs):
+        super().__init__(**kwargs)
+        self._board = board
+        self.rows = board.rows
+        self.cols = board.cols
+        self._on_cell_cb = on_cell_cb
+        self._theme = theme
+
+        self._cell_size = DEFAULT_VIEW_CELL
+        self._center = (board.rows / 2.0, board.cols / 2.0)  # (row, col) shown at the widget centre
+        self._fitted = False
+        self._pool: List[Rectangle] = []
+        self._visible: Dict[Tuple[int, int], Rectangle] = {}
+        self._touches: List = []
+        self.size_hint = (None, None)  # the layout sizes the viewport to the free area
+
+        with self.canvas:
+            Color(1, 1, 1, 1)
+        self._redraw_trigger = Clock.create_trigger(self._redraw)
+        self.bind(pos=self._redraw_trigger, size=self._redraw_trigger)
+
+    # ------------------- public API dùng trong layout ---------------------
+    def set_cell_size(self, cell_size: float) -> None:
+        """Viewport mode ignores the layout's cell size: the zoom belongs to the user."""
+
+    def fit(self) -> None:
+        """Show the whole board if cells stay at least MIN_VIEW_CELL, else the middle of it."""
+        if self.width <= 0 or self.height <= 0:
+            return
+        board = self._board
+        if board.bounded:
+            size = min(self.width / self.cols, self.height / self.rows)
+            self._center = (self.rows / 2.0, self.cols / 2.0)
+        else:
+            region = board.eval_region()
+            size = DEFAULT_VIEW_CELL
+            if region is None:
+                self._center = (0.5, 0.5)
+            else:
+                r_lo, c_lo, r_hi, c_hi = region
+                self._center = ((r_lo + r_hi + 1) / 2.0, (c_lo + c_hi + 1) / 2.0)
+        self._cell_size = min(max(size, MIN_VIEW_CELL), MAX_VIEW_CELL)
+        self._fitted = True
+        self._redraw_trigger()
+
+    def reset(self, board):
+        self._board = board
+        self._redraw_trigger()
+
+    def update_cell(self, coords: Tuple[int, int], symbol: str):
+        rect = self._visible.get(coords)
+        if rect is not None:  # off-screen cells are drawn from the board when they scroll in
+            rect.texture = self._theme.texture(symbol)
+
+    def zoom_at(self, x: float, y: float, factor: float) -> None:
+        """Zoom by `factor`, keeping the board point under (x, y) fixed."""
+        new_size = min(max(self._cell_size * factor, MIN_VIEW_CELL), MAX_VIEW_CELL)
+        row, col = self._board_point(x, y)
+        self._cell_size = new_size
+        self._center = (row - (self.center_y - y) / new_size, col - (x - self.center_x) / new_size)
+        self._clamp_center()
+        self._redraw_trigger()
+
+    def pan(self, dx: float, dy: float) -> None:
+        self._center = (self._center[0] + dy / self._cell_size, self._center[1] - dx / self._cell_size)
+        self._clamp_center()
+        self._redraw_trigger()
+
+    # ------------------- touches ------------------------------------------
+    def cell_at(self, x: float, y: float) -> Optional[Tuple[int, int]]:
+        """(row, col) under a window point, or None outside the widget or the board."""
+        if not self.collide_point(x, y):
+            return None
+        row, col = self._board_point(x, y)
+        row, col = math.floor(row), math.floor(col)
+        if self._board.bounded and not (0 <= row < self.rows and 0 <= col < self.cols):
+            return None
+        return row, col
+
+    def on_touch_down(self, touch):
+        if not self.collide_point(*touch.pos):
+            return super().on_touch_down(touch)
+        if touch.is_mouse_scrolling:
+            if touch.button in ("scrolldown", "scrollup"):
+                self.zoom_at(touch.x, touch.y, ZOOM_STEP if touch.button == "scrolldown" else 1 / ZOOM_STEP)
+            return True
+        touch.grab(self)
+        touch.ud[self] = {"start": touch.pos, "tap": not self._touches}
+        for other in self._touches:
+            touch.ud[self]["tap"] = other.ud[self]["tap"] = False  # a second finger means pinch
+        self._touches.append(touch)
+        return True
+
+    def on_touch_move(self, touch):
+        if touch.grab_current is not self:
+            return super().on_touch_move(touch)
+        state = touch.ud[self]
+        sx, sy = state["start"]
+        if abs(touch.x - sx) > TAP_SLOP or abs(touch.y - sy) > TAP_SLOP:
+            state["tap"] = False
+        others = [t for t in self._touches if t is not touch]
+        if others:
+            other = others[0]
+            before = math.hypot(touch.px - other.x, touch.py - other.y)
+            after = math.hypot(touch.x - other.x, touch.y - other.y)
+            if before > 0:
+                self.zoom_at((touch.x + other.x) / 2, (touch.y + other.y) / 2, after / before)
+        elif not state["tap"]:
+            self.pan(touch.dx, touch.dy)
+        return True
+
+    def on_touch_up(self, touch):
+        if touch.grab_current is not self:
+            return super().on_touch_up(touch)
+        touch.ungrab(self)
+        if touch in self._touches:
+            self._touches.remove(touch)
+        if touch.ud[self]["tap"]:
+            cell = self.cell_at(*touch.pos)
+            if cell is not None:
+                self._on_cell_cb(*cell)
+        return True
+
+    # ------------------- helpers ------------------------------------------
+    def _board_point(self, x: float, y: float) -> Tuple[float, float]:
+        """Continuous (row, col) under a window point; cell (r, c) spans [r, r+1) x [c, c+1)."""
+        size = self._cell_size
+        return self._center[0] + (self.center_y - y) / size, self._center[1] + (x - self.center_x) / size
+
+    def _clamp_center(self) -> None:
+        if self._board.bounded:
+            self._center = (min(max(self._center[0], 0.0), float(self.rows)),
+                            min(max(self._center[1], 0.0), float(self.cols)))
+
+    def _redraw(self, *_):
+        """Give each visible cell a pooled Rectangle; hide the rest of the pool."""
+        if not self._fitted:
+            self.fit()
+            if not self._fitted:
+                return
+        size = self._cell_size
+        row_top, col_left = self._board_point(self.x, self.top)
+        row_bottom, col_right = self._board_point(self.right, self.y)
+        r_lo, r_hi = math.floor(row_top), math.ceil(row_bottom) - 1
+        c_lo, c_hi = math.floor(col_left), math.ceil(col_right) - 1
+        if self._board.bounded:
+            r_lo, r_hi = max(r_lo, 0), min(r_hi, self.rows - 1)
+            c_lo, c_hi = max(c_lo, 0), min(c_hi, self.cols - 1)
+
+        needed = max(0, r_hi - r_lo + 1) * max(0, c_hi - c_lo + 1)
+        if needed > len(self._pool):
+            with self.canvas:
+                for _ in range(needed - len(self._pool)):
+                    self._pool.append(Rectangle(size=(0, 0)))
+
+        cell, texture = self._board.cell, self._theme.texture
+        center_row, center_col = self._center
+        mid_x, mid_y = self.center_x, self.center_y
+        visible: Dict[Tuple[int, int], Rectangle] = {}
+        pool = iter(self._pool)
+        for r in range(r_lo, r_hi + 1):
+            y = mid_y - (r + 1 - center_row) * size
+            for c in range(c_lo, c_hi + 1):
+                rect = next(pool)
+                rect.pos = (mid_x + (c - center_col) * size, y)
+                rect.size = (size, size)
+                rect.texture = texture(cell(r, c))
+                visible[(r, c)] = rect
+        for rect in pool:  # the rest of the pool stays allocated but draws nothing
+            if rect.size[0]:
+                rect.size = (0, 0)
+        self._visible = visible
+
+
+def make_board_widget(board, on_cell_cb: Callable[[int, int], None], theme: Theme, **kwargs):
+    """GridLayout of cell widgets for small boards, the single-canvas renderer for large ones,
+    and the pan/zoom viewport for very large or unbounded boards."""
+    choice = os.environ.get(BOARD_WIDGET_ENV, "").lower()
+    if choice == "viewport" or not board.bounded or \
+            (choice not in ("grid", "canvas") and board.rows * board.cols >= VIEWPORT_MIN_CELLS):
+        return ViewportBoardWidget(board, on_cell_cb, theme, **kwargs)
+    if choice == "canvas" or (choice != "grid" and board.rows * board.cols >= CANVAS_MIN_CELLS):
+        return CanvasBoardWidget(board, on_cell_cb, theme, **kwargs)
+    return BoardWidget(board, on_cell_cb, theme, **kwargs)